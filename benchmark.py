@@ -0,0 +1,303 @@
+#!/usr/bin/python
+
+#	Copyright (c) 2008 Matthew Ball
+#
+#	Permission is hereby granted, free of charge, to any person
+#	obtaining a copy of this software and associated documentation
+#	files (the "Software"), to deal in the Software without
+#	restriction, including without limitation the rights to use,
+#	copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following
+#	conditions:
+#
+#	The above copyright notice and this permission notice shall be
+#	included in all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#	EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#	OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#	NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#	HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#	WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#	OTHER DEALINGS IN THE SOFTWARE.
+
+# Generates a synthetic Doxygen XML corpus and times each stage of
+# doxyclean.py on it, so that performance can be measured and regressions
+# reproduced without access to a real project.
+
+from __future__ import print_function
+import sys
+import os
+import random
+import shutil
+import tempfile
+import time
+from optparse import OptionParser
+from xml.sax.saxutils import escape
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
+import doxyclean
+
+# Words used to fill descriptions
+vocabulary = ("the", "a", "returns", "object", "value", "when", "is", "called", "with", "of",
+	"this", "method", "for", "an", "array", "string", "delegate", "must", "not", "be", "nil",
+	"receiver", "index", "default", "that", "notification", "sent", "after", "before", "view")
+
+# Framework names that descriptions may mention, so links to them get exercised
+frameworkNames = ("NSObject", "NSString", "NSArray", "NSDictionary", "NSData", "NSError",
+	"NSNotification", "NSURL", "NSDate", "NSNumber", "NSCoding", "NSCopying")
+
+def sentence(generator, wordCount, names):
+	words = []
+	for i in range(wordCount):
+		# Every so often, mention another class instead of an ordinary word
+		if generator.random() < 0.1:
+			words.append(generator.choice(names))
+		else:
+			words.append(generator.choice(vocabulary))
+	# Only the first letter is capitalized, so the names keep their case
+	# and can be linked
+	text = " ".join(words)
+	return escape(text[:1].upper() + text[1:] + ".")
+
+def descriptionXML(generator, options, names, documented):
+	if not documented:
+		return "<briefdescription>\n</briefdescription>\n<detaileddescription>\n</detaileddescription>\n"
+
+	return ("<briefdescription><para>%s</para></briefdescription>\n"
+		"<detaileddescription><para>%s</para><para>%s</para></detaileddescription>\n") % (
+		sentence(generator, 8, names),
+		sentence(generator, options.words, names),
+		sentence(generator, options.words // 2, names))
+
+def memberXML(generator, options, names, objectName, index, objectDocumented):
+	documented = objectDocumented and generator.random() >= options.undocumented
+	returnType = generator.choice(names)
+
+	if index % 5 == 0:
+		memberName = "property%d" % index
+		return ('<memberdef kind="property" id="%s_property%d" prot="public" static="no" readable="yes" writable="yes">\n'
+			'<type>%s *</type>\n<name>%s</name>\n%s<location file="Sources/%s.h" line="%d"/>\n</memberdef>\n') % (
+			objectName, index, escape(returnType), memberName,
+			descriptionXML(generator, options, names, documented), objectName, index + 10)
+
+	static = "no"
+	if index % 7 == 0:
+		static = "yes"
+	memberName = "doSomething%d:withObject:" % index
+	parameterDescription = ""
+	if documented:
+		parameterDescription = ('<para><parameterlist kind="param"><parameteritem><parameternamelist><parametername>value</parametername></parameternamelist>'
+			'<parameterdescription><para>%s</para></parameterdescription></parameteritem></parameterlist>'
+			'<simplesect kind="return"><para>%s</para></simplesect></para>') % (
+			sentence(generator, 6, names), sentence(generator, 6, names))
+	description = descriptionXML(generator, options, names, documented).replace("</detaileddescription>", parameterDescription + "</detaileddescription>")
+
+	return ('<memberdef kind="function" id="%s_method%d" prot="public" static="%s" const="no" explicit="no" inline="no" virt="virtual">\n'
+		'<type>%s *</type>\n<name>%s</name>\n'
+		'<param><type>NSString *</type><declname>value</declname></param>\n'
+		'<param><attributes>[withObject]</attributes><type>id</type><declname>object</declname></param>\n'
+		'%s<location file="Sources/%s.h" line="%d"/>\n</memberdef>\n') % (
+		objectName, index, static, escape(returnType), memberName,
+		description, objectName, index + 10)
+
+# Headers of the sections that group members. The links to them use
+# characters that HTML serializers escape in different ways.
+sectionHeaders = ['Drawing & "Layout"', "Hooks [for] {subclasses} | ^overrides \\ `only`", "Accessing Values"]
+
+def compoundXML(generator, options, names, kind, objectName):
+	compoundName = objectName
+	if kind == "protocol":
+		compoundName += "-p"
+
+	# Undocumented objects have no documented members, so doxyclean skips them
+	documented = generator.random() >= options.undocumented
+	header = generator.choice(sectionHeaders)
+	members = [memberXML(generator, options, names, objectName, index, documented) for index in range(options.members)]
+	sections = '<sectiondef kind="user-defined">\n<header>%s</header>\n%s</sectiondef>\n' % (escape(header), "".join(members[:options.members // 2]))
+	sections += '<sectiondef kind="public-func">\n%s</sectiondef>\n' % ("".join(members[options.members // 2:]))
+
+	return ('<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'no\'?>\n'
+		'<doxygen version="1.6.1">\n'
+		'<compounddef id="%s" kind="%s" prot="public">\n'
+		'<compoundname>%s</compoundname>\n'
+		'%s'
+		'%s'
+		'<inheritancegraph>\n'
+		'<node id="1"><label>%s</label><childnode refid="2" relation="public-inheritance"></childnode><childnode refid="3" relation="public-inheritance"></childnode></node>\n'
+		'<node id="2"><label>NSObject</label></node>\n'
+		'<node id="3"><label>&lt;NSCoding&gt;</label></node>\n'
+		'</inheritancegraph>\n'
+		'<location file="Sources/%s.h" line="1"/>\n'
+		'</compounddef>\n'
+		'</doxygen>\n') % (
+		objectName, kind, escape(compoundName), sections,
+		descriptionXML(generator, options, names, documented),
+		escape(compoundName), objectName)
+
+# Write the corpus, returning the number of files and their total size
+def generateCorpus(directory, options):
+	generator = random.Random(options.seed)
+
+	objects = [("class", "BMClass%d" % i) for i in range(options.classes)]
+	objects += [("protocol", "BMProtocol%d" % i) for i in range(options.protocols)]
+	objects += [("category", "NSString(BMCategory%d)" % i) for i in range(options.categories)]
+	names = [objectName for (kind, objectName) in objects if kind != "category"] + list(frameworkNames)
+
+	totalSize = 0
+	for (index, (kind, objectName)) in enumerate(objects):
+		prefix = "interface_"
+		if kind == "protocol":
+			prefix = "protocol_"
+		filePath = os.path.join(directory, "%sbm%d.xml" % (prefix, index))
+
+		f = open(filePath, "wb")
+		f.write(compoundXML(generator, options, names, kind, objectName).encode("utf-8"))
+		f.close()
+		totalSize += os.path.getsize(filePath)
+
+	return (len(objects), totalSize)
+
+# Link and convert are separate stages here, although doxyclean.py runs
+# them back to back for each object, so that each can be timed on its own
+def linkObject(symbolTable, doxygenObject):
+	doxyclean.linkify(doxygenObject, symbolTable)
+
+def convertObject(htmlOutputDirectory, renderer, compress, doxygenObject):
+	doxyclean.convertToHTML(doxygenObject, htmlOutputDirectory, "Benchmark", renderer, compress)
+
+def peakMemory():
+	if resource is None:
+		return None
+
+	peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+		resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+	# Linux reports kilobytes, Mac OS X reports bytes
+	if sys.platform != "darwin":
+		peak *= 1024
+	return peak
+
+# Run each stage in turn, returning (name, wall time, CPU time, peak memory)
+# for each one
+def runStages(inputDirectory, outputDirectory, jobs, renderer, compress):
+	xmlOutputDirectory = os.path.join(outputDirectory, "xml")
+	htmlOutputDirectory = os.path.join(outputDirectory, "html")
+	results = []
+	state = {}
+
+	def clean():
+		inputPaths = [(os.path.join(inputDirectory, fileName), xmlOutputDirectory) for fileName in sorted(os.listdir(inputDirectory))]
+		objects = doxyclean.runTasks(doxyclean.cleanXML, inputPaths, jobs)
+		state["objects"] = [doxygenObject for doxygenObject in objects if doxygenObject.documented]
+
+	def index():
+		state["indexPath"] = doxyclean.createIndexXML(state["objects"], xmlOutputDirectory, "Benchmark")
+
+	def link():
+		tablePaths = doxyclean.symbolTablePaths(False, None)
+		symbolTable = doxyclean.linkSymbolTable(doxyclean.frameworkSymbolTable(tablePaths), state["objects"])
+		doxyclean.runTasks(linkObject, [(doxygenObject,) for doxygenObject in state["objects"]], jobs, (symbolTable,))
+
+	def convert():
+		doxyclean.runTasks(convertObject, [(doxygenObject,) for doxygenObject in state["objects"]], jobs, (htmlOutputDirectory, renderer, compress))
+
+	def convertIndex():
+		doxyclean.convertIndexToHTML(state["indexPath"], htmlOutputDirectory, compress)
+
+	for (name, stage) in (("clean", clean), ("index", index), ("link", link), ("html", convert), ("index html", convertIndex)):
+		wallStart = time.time()
+		cpuStart = doxyclean.cpuTime()
+		stage()
+		results.append((name, time.time() - wallStart, doxyclean.cpuTime() - cpuStart, peakMemory()))
+
+	return (results, state["objects"])
+
+# Render every page with both renderers, and return the names of the
+# objects whose pages differ
+def compareRenderers(objects):
+	differences = []
+	for doxygenObject in objects:
+		# Reload the linked document, which worker processes may have written
+		doxygenObject.document = None
+		document = doxygenObject.loadDocument()
+		if doxyclean.renderObjectHTML(document, "Benchmark") != doxyclean.stylesheetNamed("object2html.xslt").serialize(document, projectName="Benchmark"):
+			differences.append(doxygenObject.name)
+	return differences
+
+def main(argv=None):
+	if argv is None:
+		argv = sys.argv
+
+	optionParser = OptionParser(usage="%prog [options]")
+	optionParser.add_option("-c", "--classes", type="int", dest="classes", default=200, help="The number of classes to generate. Default is 200")
+	optionParser.add_option("-p", "--protocols", type="int", dest="protocols", default=20, help="The number of protocols to generate. Default is 20")
+	optionParser.add_option("-k", "--categories", type="int", dest="categories", default=10, help="The number of categories to generate. Default is 10")
+	optionParser.add_option("-m", "--members", type="int", dest="members", default=20, help="The number of members in each object. Default is 20")
+	optionParser.add_option("-w", "--words", type="int", dest="words", default=40, help="The number of words in each detailed description. Default is 40")
+	optionParser.add_option("-u", "--undocumented", type="float", dest="undocumented", default=0.25, help="The fraction of objects and members left undocumented. Default is 0.25")
+	optionParser.add_option("-j", "--jobs", type="int", dest="jobs", default=1, help="The number of worker processes doxyclean uses. Default is 1")
+	optionParser.add_option("--renderer", type="choice", choices=["xslt", "python"], dest="renderer", default="xslt", help="How doxyclean produces each object's HTML page. Default is xslt")
+	optionParser.add_option("--compress", action="store_true", dest="compress", default=False, help="Minify and compress the HTML output, as doxyclean's --compress does")
+	optionParser.add_option("--compare-renderers", action="store_true", dest="compareRenderers", default=False, help="Also render each page with both renderers, and report the pages where their markup differs")
+	optionParser.add_option("-r", "--repeat", type="int", dest="repeat", default=1, help="The number of times to run the stages. The fastest run is reported. Default is 1")
+	optionParser.add_option("-s", "--seed", type="int", dest="seed", default=0, help="The random seed for the corpus. Default is 0")
+	optionParser.add_option("-o", "--output", type="string", dest="outputDirectory", default=None, help="Keep the corpus and output in this directory, rather than a temporary one")
+	(options, args) = optionParser.parse_args(argv[1:])
+
+	workDirectory = options.outputDirectory or tempfile.mkdtemp(prefix="doxyclean-benchmark-")
+	inputDirectory = os.path.join(workDirectory, "doxygen")
+	outputDirectory = os.path.join(workDirectory, "output")
+
+	try:
+		doxyclean._mkdir(inputDirectory)
+		(fileCount, inputSize) = generateCorpus(inputDirectory, options)
+
+		bestResults = None
+		for run in range(options.repeat):
+			if os.path.exists(outputDirectory):
+				shutil.rmtree(outputDirectory)
+			(results, objects) = runStages(inputDirectory, outputDirectory, options.jobs, options.renderer, options.compress)
+			if bestResults is None or sum(result[1] for result in results) < sum(result[1] for result in bestResults):
+				bestResults = results
+		objectCount = len(objects)
+
+		differences = None
+		if options.compareRenderers:
+			differences = compareRenderers(objects)
+	finally:
+		if not options.outputDirectory:
+			shutil.rmtree(workDirectory)
+
+	print("Corpus: %d files, %.1f MB, %d documented objects" % (fileCount, inputSize / 1048576.0, objectCount))
+	print("Backend: %s, %s renderer, %d job(s)" % (doxyclean.haveLXML and "lxml" or "xsltproc", options.renderer, options.jobs))
+	print()
+	print("%-12s %10s %10s %12s %10s %14s" % ("Stage", "Wall (s)", "CPU (s)", "Objects/s", "MB/s", "Peak RSS (MB)"))
+	for (name, wallTime, cpuTime, peak) in bestResults:
+		objectRate = objectCount / max(wallTime, 1e-6)
+		byteRate = inputSize / 1048576.0 / max(wallTime, 1e-6)
+		peakText = "-"
+		if peak is not None:
+			peakText = "%.1f" % (peak / 1048576.0)
+		print("%-12s %10.3f %10.3f %12.1f %10.2f %14s" % (name, wallTime, cpuTime, objectRate, byteRate, peakText))
+	totalTime = sum(result[1] for result in bestResults)
+	print("%-12s %10.3f %10.3f %12.1f %10.2f" % ("total", totalTime, sum(result[2] for result in bestResults), objectCount / max(totalTime, 1e-6), inputSize / 1048576.0 / max(totalTime, 1e-6)))
+
+	if differences is not None:
+		print()
+		print("Renderers: %d of %d pages differ" % (len(differences), objectCount))
+		for name in differences[:10]:
+			print("  %s" % (name))
+		if differences:
+			return 1
+
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -23,13 +23,71 @@
 #	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 #	OTHER DEALINGS IN THE SOFTWARE.
 
+from __future__ import print_function
+
 import sys 
 import os 
 import fnmatch
 import re
 import errno
+import subprocess
+import multiprocessing
+import hashlib
+import json
+import time
+import gzip
+import io
+import shutil
+import tempfile
+import collections
 from optparse import OptionParser
-from xml.dom import minidom
+from xml.sax.saxutils import XMLGenerator
+
+# The stylesheets, framework symbol tables and assets sit beside this
+# script, wherever the program importing it is
+scriptDirectory = os.path.dirname(os.path.abspath(__file__))
+
+# The same script runs on Python 2.7 and Python 3
+try:
+	from urllib.parse import quote
+except ImportError:
+	from urllib import quote
+try:
+	stringTypes = basestring
+except NameError:
+	stringTypes = str
+
+# Python 2 passes the command line's arguments, such as project names,
+# as UTF-8 encoded bytes, where lxml and XMLGenerator need text
+def decodeText(value):
+	if isinstance(value, bytes):
+		return value.decode("utf-8")
+	return value
+
+# lxml lets us compile each stylesheet once and apply it in-process.
+# Without it, every transform falls back to running xsltproc.
+try:
+	from lxml import etree
+	haveLXML = True
+except ImportError:
+	try:
+		import xml.etree.cElementTree as etree
+	except ImportError:
+		import xml.etree.ElementTree as etree
+	haveLXML = False
+
+# Brotli is only needed to write .br files with --compress
+try:
+	import brotli
+	haveBrotli = True
+except ImportError:
+	haveBrotli = False
+
+# Set from the --verbose option
+verbose = False
+
+# Set when --profile or --stats-json is given
+profile = None
 
 def _mkdir(newdir):
     if os.path.isdir(newdir):
@@ -43,1177 +101,2416 @@ def _mkdir(newdir):
             _mkdir(head)
 
         if tail:
-            os.mkdir(newdir)
+            # Another worker may have created it in the meantime
+            try:
+                os.mkdir(newdir)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+# Files in a staging directory may be hard links to files in the published
+# build, so they are replaced rather than written over
+def openOutputFile(path):
+	if os.path.lexists(path):
+		os.remove(path)
+	return open(path, "wb")
+
+def cpuTime():
+	# User and system time of this process and the children it has waited for
+	times = os.times()
+	return times[0] + times[1] + times[2] + times[3]
+
+# Counts of the work done by a stage or a task, for --profile and --stats-json.
+# Counting is cheap enough to always do, so only the report is optional.
+class Counters(object):
+	names = ("wallTime", "cpuTime", "filesRead", "bytesRead", "filesWritten", "bytesWritten", "parses", "subprocesses", "cacheHits", "cacheMisses")
+	
+	def __init__(self):
+		for name in self.names:
+			setattr(self, name, 0)
+	
+	def add(self, other):
+		for name in self.names:
+			setattr(self, name, getattr(self, name) + getattr(other, name))
+	
+	def countRead(self, byteCount):
+		self.filesRead += 1
+		self.bytesRead += byteCount
+	
+	def countWrite(self, byteCount):
+		self.filesWritten += 1
+		self.bytesWritten += byteCount
+	
+	def dictionary(self):
+		return dict((name, getattr(self, name)) for name in self.names)
+
+# The counters for whatever is running now
+# Each task gets its own, so that its work can be reported per object
+counters = Counters()
+
+class Profile(object):
+	def __init__(self):
+		self.stages = []
+		self.objects = {}
+		self.stageName = None
+	
+	# End the current stage, if any, and start counting the next one
+	def begin(self, stageName):
+		global counters
+		self.end()
+		self.stageName = stageName
+		self.stageCounters = counters = Counters()
+		self.taskCount = 0
+		self.startTime = time.time()
+		self.startCPU = cpuTime()
+	
+	def end(self):
+		global counters
+		if self.stageName is None:
+			return
+		
+		# Worker processes are waited for by the end of each stage,
+		# so the CPU time includes theirs
+		self.stageCounters.wallTime = time.time() - self.startTime
+		self.stageCounters.cpuTime = cpuTime() - self.startCPU
+		stage = self.stageCounters.dictionary()
+		stage.update(name=self.stageName, tasks=self.taskCount)
+		self.stages.append(stage)
+		self.stageName = None
+		counters = Counters()
+	
+	# Tasks run with their own counters, so add them to the stage's
+	def addTask(self, label, taskCounters):
+		self.stageCounters.add(taskCounters)
+		self.taskCount += 1
+		if label is not None:
+			self.objects.setdefault(label, {})[self.stageName] = taskCounters.dictionary()
+	
+	# namesForLabels holds the name of the object of each task label
+	def report(self, namesForLabels, jobs):
+		self.end()
+		
+		objectReports = []
+		for (fileName, stages) in self.objects.items():
+			objectReports.append({
+				"file": fileName,
+				"name": namesForLabels.get(fileName),
+				"wallTime": sum(stage["wallTime"] for stage in stages.values()),
+				"cpuTime": sum(stage["cpuTime"] for stage in stages.values()),
+				"stages": stages
+			})
+		objectReports.sort(key=lambda objectReport: (-objectReport["wallTime"], objectReport["file"]))
+		
+		backend = "xsltproc"
+		if haveLXML:
+			backend = "lxml"
+		return {
+			"backend": backend,
+			"jobs": jobs,
+			"wallTime": sum(stage["wallTime"] for stage in self.stages),
+			"cpuTime": sum(stage["cpuTime"] for stage in self.stages),
+			"stages": self.stages,
+			"objects": objectReports
+		}
+
+def beginStage(stageName):
+	if profile is not None:
+		profile.begin(stageName)
+
+def printReport(report):
+	print("%-12s %6s %10s %10s %8s %10s %8s %10s %7s %6s %6s" % ("Stage", "Tasks", "Wall (s)", "CPU (s)", "Read", "Bytes", "Written", "Bytes", "Parses", "Procs", "Cached"))
+	for stage in report["stages"]:
+		print("%-12s %6d %10.3f %10.3f %8d %10d %8d %10d %7d %6d %6d" % (stage["name"], stage["tasks"], stage["wallTime"], stage["cpuTime"],
+			stage["filesRead"], stage["bytesRead"], stage["filesWritten"], stage["bytesWritten"], stage["parses"], stage["subprocesses"], stage["cacheHits"]))
+	print("%-12s %6s %10.3f %10.3f" % ("total", "", report["wallTime"], report["cpuTime"]))
+	
+	if report["objects"]:
+		print()
+		print("Slowest objects:")
+		for objectReport in report["objects"][:10]:
+			print("%10.3f  %s" % (objectReport["wallTime"], objectReport["name"] or objectReport["file"]))
+
+class Stylesheet(object):
+	def __init__(self, fileName):
+		self.path = os.path.join(scriptDirectory, fileName)
+		self.hash = hashFile(self.path)
+		
+		# Compile the stylesheet once, if we can run it in-process
+		self.transform = None
+		if haveLXML:
+			self.transform = etree.XSLT(etree.parse(self.path))
+	
+	# Transform a parsed document and return the resulting document
+	# Keyword arguments are passed to the stylesheet as string parameters
+	def apply(self, document, **parameters):
+		if self.transform is not None:
+			return self.transform(document, **self.quoteParameters(parameters))
+		
+		output = self.runXsltproc(document, parameters)
+		counters.parses += 1
+		return etree.ElementTree(etree.fromstring(output))
+	
+	# Transform a parsed document and return the result,
+	# serialized according to the stylesheet's <xsl:output> element
+	def serialize(self, document, **parameters):
+		if self.transform is not None:
+			return bytes(self.transform(document, **self.quoteParameters(parameters)))
+		return self.runXsltproc(document, parameters)
+	
+	def quoteParameters(self, parameters):
+		return dict((name, etree.XSLT.strparam(decodeText(value))) for (name, value) in parameters.items())
+	
+	def runXsltproc(self, document, parameters):
+		arguments = ["xsltproc"]
+		for (name, value) in parameters.items():
+			arguments.extend(["--stringparam", name, value])
+		arguments.extend([self.path, "-"])
+		
+		counters.subprocesses += 1
+		process = subprocess.Popen(arguments, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+		output = process.communicate(etree.tostring(document.getroot(), encoding="UTF-8"))[0]
+		if process.returncode != 0:
+			raise OSError("xsltproc failed to apply %s" % self.path)
+		return output
+
+# Stylesheets are compiled on first use and then reused for the rest of the run
+stylesheets = {}
+
+def stylesheetNamed(fileName):
+	if fileName not in stylesheets:
+		stylesheets[fileName] = Stylesheet(fileName)
+	return stylesheets[fileName]
+
+# A cache of cleaned XML and rendered HTML, kept between runs, and shared
+# between machines if its directory is. Each entry is named by a hash of
+# everything that went into it, so entries never go out of date. Entries are
+# written to a temporary file and renamed into place, so that runs sharing
+# the cache only ever see complete ones. Reading an entry marks it as
+# recently used, and trim removes the least recently used entries once the
+# cache grows past its maximum size.
+class TransformCache(object):
+	version = "1"
+	
+	def __init__(self, directory, maximumSize, programHash):
+		self.directory = directory
+		self.maximumSize = maximumSize
+		self.programHash = programHash
+	
+	def key(self, *parts):
+		keyHash = hashlib.sha1()
+		for part in (self.version, self.programHash) + parts:
+			if not isinstance(part, bytes):
+				part = part.encode("utf-8")
+			keyHash.update(part + b"\0")
+		return keyHash.hexdigest()
+	
+	def entryPath(self, key):
+		return os.path.join(self.directory, key[:2], key[2:])
+	
+	# Return the cached contents for key, or None
+	def get(self, key):
+		path = self.entryPath(key)
+		try:
+			f = open(path, "rb")
+			contents = f.read()
+			f.close()
+			os.utime(path, None)
+		except (IOError, OSError):
+			# Another run may have removed the entry in the meantime
+			counters.cacheMisses += 1
+			return None
+		counters.countRead(len(contents))
+		counters.cacheHits += 1
+		return contents
+	
+	def put(self, key, contents):
+		path = self.entryPath(key)
+		_mkdir(os.path.dirname(path))
+		(fileDescriptor, temporaryPath) = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+		f = os.fdopen(fileDescriptor, "wb")
+		f.write(contents)
+		f.close()
+		
+		# mkstemp only gives the owner access, but the cache may be shared
+		umask = os.umask(0)
+		os.umask(umask)
+		os.chmod(temporaryPath, 0o666 & ~umask)
+		os.rename(temporaryPath, path)
+		counters.countWrite(len(contents))
+	
+	def trim(self):
+		entries = []
+		totalSize = 0
+		for (directoryPath, directoryNames, fileNames) in os.walk(self.directory):
+			for fileName in fileNames:
+				path = os.path.join(directoryPath, fileName)
+				try:
+					stat = os.stat(path)
+				except OSError:
+					continue
+				
+				# Temporary files are only left behind by interrupted runs
+				if fileName.startswith(".tmp-"):
+					if stat.st_mtime < time.time() - 24 * 60 * 60:
+						removePath(path)
+					continue
+				
+				entries.append((stat.st_mtime, stat.st_size, path))
+				totalSize += stat.st_size
+		
+		entries.sort()
+		for (modificationTime, size, path) in entries:
+			if totalSize <= self.maximumSize:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+			totalSize -= size
 
-def longestToShortestCompare(x, y):
-	if len(x) > len(y):
-		return -1
-	elif len(x) < len(y):
-		return 1
+# Arguments shared by every task in a pool, sent to each worker only once
+sharedTaskArguments = ()
+
+def _initWorker(isVerbose, arguments):
+	global verbose, sharedTaskArguments
+	verbose = isVerbose
+	sharedTaskArguments = arguments
+
+# Run one task with its own counters, and return them with its result
+def _runTask(task):
+	global counters
+	function, arguments = task
+	
+	previousCounters = counters
+	counters = Counters()
+	startTime = time.time()
+	startCPU = cpuTime()
+	try:
+		result = function(*(sharedTaskArguments + arguments))
+		counters.wallTime = time.time() - startTime
+		counters.cpuTime = cpuTime() - startCPU
+		return (result, counters)
+	finally:
+		counters = previousCounters
+
+# Call function once per argument tuple, spread over the given number of
+# worker processes, and return the results in order
+# When profiling, each task's counters are reported under its label
+def runTasks(function, argumentLists, jobs, sharedArguments=(), labels=None):
+	tasks = [(function, tuple(arguments)) for arguments in argumentLists]
+	if jobs <= 1 or len(tasks) <= 1:
+		global sharedTaskArguments
+		sharedTaskArguments = sharedArguments
+		results = [_runTask(task) for task in tasks]
 	else:
-		return 0
+		pool = multiprocessing.Pool(min(jobs, len(tasks)), _initWorker, (verbose, sharedArguments))
+		try:
+			results = pool.map(_runTask, tasks)
+		finally:
+			pool.close()
+			pool.join()
+	
+	if profile is not None:
+		for (index, (result, taskCounters)) in enumerate(results):
+			profile.addTask(labels and labels[index], taskCounters)
+	return [result for (result, taskCounters) in results]
 
-def fileIsDocumented(filePath):
-	# Only XML files can contain documentation information
-	if not os.path.splitext(filePath)[1] == ".xml":
-		return False
+# The subdirectory, in both xml/ and html/, for each kind of object
+directoryForKind = {
+	"class": "Classes",
+	"category": "Categories",
+	"protocol": "Protocols"
+}
+
+# Everything the later stages need to know about one object.
+# The Doxygen file is parsed once, and the cleaned document stays in memory
+# so that indexing, linking and conversion don't have to read it again.
+class DoxygenObject(object):
+	def __init__(self, sourcePath, sourceHash, documented):
+		self.sourcePath = sourcePath
+		self.sourceHash = sourceHash
+		self.documented = documented
+		self.name = None
+		self.kind = None
+		self.path = None
+		self.brief = None
+		self.members = []
+		self.links = []
+		self.document = None
+	
+	# Recreate an object from its entry in the build manifest,
+	# without reading the source file again
+	@classmethod
+	def fromRecord(cls, sourcePath, record, outputDirectory):
+		doxygenObject = cls(sourcePath, record["sourceHash"], record["documented"])
+		if doxygenObject.documented:
+			doxygenObject.name = record["name"]
+			doxygenObject.kind = record["kind"]
+			doxygenObject.path = doxygenObject.outputPath(outputDirectory, ".xml")
+			doxygenObject.brief = record["brief"]
+			doxygenObject.members = [tuple(member) for member in record["members"]]
+			doxygenObject.links = record["links"]
+		return doxygenObject
+	
+	def record(self):
+		record = {"sourceHash": self.sourceHash, "documented": self.documented}
+		if self.documented:
+			record.update(name=self.name, kind=self.kind, brief=self.brief, members=self.members, links=self.links)
+		return record
+	
+	def outputPath(self, directory, extension):
+		return os.path.join(directory, directoryForKind[self.kind], self.name + extension)
+	
+	# Parsed documents can't be sent to worker processes,
+	# so workers reload them from the cleaned file instead
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state["document"] = None
+		return state
 	
-	# Check if the object is documented
-	originaldoc = minidom.parse(filePath)
-	briefList = originaldoc.getElementsByTagName('briefdescription')
-	detailList = originaldoc.getElementsByTagName('detaileddescription')
+	def loadDocument(self):
+		if self.document is None:
+			self.document = etree.parse(self.path)
+			counters.countRead(os.path.getsize(self.path))
+			counters.parses += 1
+		return self.document
+	
+	def save(self):
+		f = openOutputFile(self.path)
+		self.document.write(f, encoding="UTF-8", xml_declaration=True)
+		f.close()
+		counters.countWrite(os.path.getsize(self.path))
 
-	for briefItem in briefList:
-		paraList = briefItem.getElementsByTagName('para')
-		if len(paraList) > 0:
-			return True
+# Doxygen only writes paragraphs inside descriptions, so a file without any
+# has no documentation, and can be rejected without parsing it
+paragraphPattern = re.compile(b"<para[\\s/>]")
 
-	for detailItem in detailList:
-		paraList = detailItem.getElementsByTagName('para')
-		if len(paraList) > 0:
+def containsParagraph(f):
+	previousChunk = b""
+	while True:
+		chunk = f.read(65536)
+		if not chunk:
+			return False
+		# Keep the end of the last chunk, in case a tag was split between them
+		if paragraphPattern.search(previousChunk[-5:] + chunk):
 			return True
+		previousChunk = chunk
 
+def isDocumented(document):
+	# Check if any description in the object has a paragraph
+	for tagName in ("briefdescription", "detaileddescription"):
+		for description in document.getroot().iter(tagName):
+			if description.find(".//para") is not None:
+				return True
+	
 	return False
 
-def nameForFile(filePath):
-	if not os.path.splitext(filePath)[1] == ".xml":
-		return None
+# Files bigger than this are parsed a piece at a time, so that the parts
+# object.xslt doesn't use never have to be in memory together.
+# Smaller files are faster to parse whole.
+streamingThreshold = 1024 * 1024
+
+# Elements of a Doxygen file that object.xslt never reads, by parent
+# They can be large, so they are dropped as soon as they have been parsed
+unusedElements = {
+	"compounddef": set(["listofallmembers", "collaborationgraph", "includes", "includedby", "incdepgraph", "invincdepgraph",
+		"basecompoundref", "derivedcompoundref", "innerclass", "templateparamlist", "programlisting"]),
+	"memberdef": set(["definition", "argsstring", "inbodydescription", "references", "referencedby", "reimplements",
+		"reimplementedby", "initializer", "exceptions", "bitfield", "templateparamlist"])
+}
+
+# A file that hashes everything read from it
+class HashingFile(object):
+	def __init__(self, f):
+		self.file = f
+		self.hash = hashlib.sha1()
+		self.size = 0
 	
-	xmlDoc = minidom.parse(filePath)
-	return xmlDoc.getElementsByTagName("name")[0].firstChild.data
+	def read(self, size=-1):
+		data = self.file.read(size)
+		self.hash.update(data)
+		self.size += len(data)
+		return data
+	
+	# Read whatever the parser left, so the hash covers the whole file
+	def finish(self):
+		while self.read(65536):
+			pass
+		return self.hash.hexdigest()
 
-def typeForFile(filePath):
-	if not os.path.splitext(filePath)[1] == ".xml":
-		return None
+def memberIsDocumented(memberElement):
+	return memberElement.find("briefdescription/para") is not None or memberElement.find("detaileddescription/para") is not None
+
+# Parse a Doxygen file one element at a time, keeping only what object.xslt
+# uses, so that the whole file never has to be in memory at once.
+# Members without documentation are dropped as soon as they end, since
+# object.xslt skips them. Returns whether any description in the file has
+# a paragraph, and the pruned document.
+def scanDoxygenXML(f):
+	# lxml can find parents itself, so it only needs the end of each element
+	if haveLXML:
+		parser = etree.iterparse(f, events=("end",))
+	else:
+		parser = etree.iterparse(f, events=("start", "end"))
+	stack = []
+	documented = False
+	
+	# Unused elements are only removed at the next event, once the parser
+	# has moved past them, since the text after them may still be being parsed
+	unused = []
+	
+	for (event, element) in parser:
+		for (parent, child) in unused:
+			parent.remove(child)
+		del unused[:]
+		
+		if event == "start":
+			stack.append(element)
+			continue
 		
-	xmlDoc = minidom.parse(filePath)
-	return xmlDoc.getElementsByTagName("object")[0].attributes["kind"].value
+		if haveLXML:
+			parent = element.getparent()
+		else:
+			stack.pop()
+			parent = stack and stack[-1] or None
+		
+		if element.tag in ("briefdescription", "detaileddescription"):
+			if not documented and element.find(".//para") is not None:
+				documented = True
+		elif parent is not None:
+			if element.tag in unusedElements.get(parent.tag, ()) or (element.tag == "memberdef" and not memberIsDocumented(element)):
+				unused.append((parent, element))
+	
+	for (parent, child) in unused:
+		parent.remove(child)
+	
+	return (documented, etree.ElementTree(parser.root))
 
-def cleanXML(filePath, outputDirectory):
-	if not fileIsDocumented(filePath):
-		return
+def cleanXML(filePath, outputDirectory, cache=None):
+	# Only XML files can contain documentation information
+	if not os.path.splitext(filePath)[1] == ".xml":
+		return None
+	
+	f = HashingFile(open(filePath, "rb"))
+	documented = containsParagraph(f)
+	cleanedOutput = None
+	if documented and cache is not None:
+		# Cache entries are keyed on the whole file, so hash it before parsing
+		cacheKey = cache.key("clean", stylesheetNamed("object.xslt").hash, f.finish())
+		cleanedOutput = cache.get(cacheKey)
+	if documented and cleanedOutput is None:
+		# Read the file again, this time to parse it
+		counters.countRead(f.size)
+		f.file.seek(0)
+		f = HashingFile(f.file)
+		if os.fstat(f.file.fileno()).st_size > streamingThreshold:
+			(documented, sourceDocument) = scanDoxygenXML(f)
+		else:
+			sourceDocument = etree.ElementTree(etree.fromstring(f.read()))
+			documented = isDocumented(sourceDocument)
+		counters.parses += 1
+	sourceHash = f.finish()
+	f.file.close()
+	counters.countRead(f.size)
+	
+	doxygenObject = DoxygenObject(filePath, sourceHash, documented)
+	if not doxygenObject.documented:
+		return doxygenObject
 		
 	fileName = os.path.split(filePath)[1]
 		
 	global verbose
 	if verbose:
-		print "Cleaning " + fileName
+		print("Cleaning " + fileName)
 		
-	_mkdir(outputDirectory)
+	# Perform the XSL Transform, unless an earlier run already has
+	if cleanedOutput is not None:
+		cleanedDoc = etree.ElementTree(etree.fromstring(cleanedOutput))
+		counters.parses += 1
+	else:
+		cleanedDoc = stylesheetNamed("object.xslt").apply(sourceDocument)
+		if cache is not None:
+			cache.put(cacheKey, etree.tostring(cleanedDoc.getroot(), encoding="UTF-8"))
 	
-	# Perform the XSL Transform
-	tempPath = os.path.join(outputDirectory, fileName)
-	stylesheetPath = os.path.join(sys.path[0], "object.xslt")
-	os.system("xsltproc -o \"%s\" \"%s\" \"%s\"" % (tempPath, stylesheetPath, filePath))
-	
-	# Load the new XML file to get some values from it
-	objectName = nameForFile(tempPath)
-	objectType = typeForFile(tempPath)
-	
-	# Determine the appropriate subdirectory for the file
-	if objectType == "class":
-		finalPath = os.path.join(outputDirectory, "Classes")
-	elif objectType == "category":
-		finalPath = os.path.join(outputDirectory, "Categories")
-	elif objectType == "protocol":
-		finalPath = os.path.join(outputDirectory, "Protocols")
-	_mkdir(finalPath)
-	
-	# Move the file to its final location
-	finalPath = os.path.join(finalPath, objectName + ".xml")
-	os.system("mv \"%s\" \"%s\"" % (tempPath, finalPath))
-	
-def createIndexXML(directory):
-	outputPath = os.path.join(directory, "index.xml")
-	indexXML = minidom.Document()
-	
-	projectElement = indexXML.createElement("project")
-	projectElement.setAttribute("name", "##PROJECT##")
-	indexXML.appendChild(projectElement)
-	
-	# Add one element per file
-	for (path, dirs, files) in os.walk(directory):
-		for fileName in files:
-			# Only look at XML files
-			if not os.path.splitext(fileName)[1] == ".xml":
-				continue
-			
-			# Get information about the file
-			filePath = os.path.join(path, fileName)
-			objectName = nameForFile(filePath)
-			objectType = typeForFile(filePath)
-			
-			# Create an <object> element
-			objectElement = indexXML.createElement("object")
-			objectElement.setAttribute("kind", objectType)
-			projectElement.appendChild(objectElement)
+	# Get some values from the cleaned document
+	objectElement = cleanedDoc.getroot()
+	doxygenObject.document = cleanedDoc
+	doxygenObject.name = objectElement.findtext("name")
+	doxygenObject.kind = objectElement.get("kind")
+	doxygenObject.brief = normalizeSpace(stringValue(objectElement.find("description/brief"))) or None
+	for memberElement in objectElement.iterfind("sections/section/member"):
+		doxygenObject.members.append((memberElement.findtext("name"), memberElement.get("kind")))
+	
+	# Write the file to the appropriate subdirectory
+	doxygenObject.path = doxygenObject.outputPath(outputDirectory, ".xml")
+	_mkdir(os.path.dirname(doxygenObject.path))
+	doxygenObject.save()
+	
+	return doxygenObject
+	
+# The index lists each object's name, brief description and number of
+# members of each kind, from what cleaning the object found out, so no
+# object has to be read again. Objects are sorted by name, so the index
+# only changes when they do.
+def createIndexXML(objects, directory, projectName):
+	writer = XMLWriter(os.path.join(directory, "index.xml"))
+	writer.start("project", [("name", projectName)])
+	writeIndexObjects(writer, objects)
+	writer.end("project")
+	return writer.close()
+
+# The index of a multi-project build's landing page. projects holds the
+# name of each project, the path from the landing page to its html
+# directory, and its documented objects.
+def createProjectsIndexXML(projects, directory, name):
+	writer = XMLWriter(os.path.join(directory, "index.xml"))
+	writer.start("projects", [("name", name)])
+	for (projectName, projectPath, objects) in projects:
+		writer.start("project", [("name", projectName), ("path", projectPath)])
+		writeIndexObjects(writer, objects)
+		writer.end("project")
+	writer.end("projects")
+	return writer.close()
+
+def indexOrder(doxygenObject):
+	return (doxygenObject.name.lower(), doxygenObject.name, doxygenObject.kind)
+
+def writeIndexObjects(writer, objects):
+	for doxygenObject in sorted(objects, key=indexOrder):
+		writer.start("object", [("kind", doxygenObject.kind), ("members", str(len(doxygenObject.members)))])
+		writer.element("name", doxygenObject.name)
+		if doxygenObject.brief:
+			writer.element("brief", doxygenObject.brief)
+		
+		memberCounts = collections.defaultdict(int)
+		for (memberName, memberKind) in doxygenObject.members:
+			if memberKind:
+				memberCounts[memberKind] += 1
+		for memberKind in sorted(memberCounts):
+			writer.element("memberCount", str(memberCounts[memberKind]), [("kind", memberKind)])
+		writer.end("object")
+
+# Writes an XML file one element at a time, with each element that contains
+# others on lines of its own, rather than building a document to write
+class XMLWriter(object):
+	def __init__(self, path):
+		_mkdir(os.path.dirname(path))
+		self.path = path
+		self.file = openOutputFile(path)
+		self.generator = XMLGenerator(self.file, "UTF-8")
+		self.generator.startDocument()
+		self.depth = 0
+	
+	def indent(self):
+		if self.depth:
+			self.generator.ignorableWhitespace("\n" + "\t" * self.depth)
+	
+	# attributes is a list of (name, value) pairs, written in that order
+	def start(self, tag, attributes=()):
+		self.indent()
+		self.generator.startElement(tag, collections.OrderedDict((name, decodeText(value)) for (name, value) in attributes))
+		self.depth += 1
+	
+	def end(self, tag):
+		self.depth -= 1
+		self.generator.ignorableWhitespace("\n" + "\t" * self.depth)
+		self.generator.endElement(tag)
+	
+	# An element holding only text
+	def element(self, tag, text, attributes=()):
+		self.indent()
+		self.generator.startElement(tag, collections.OrderedDict((name, decodeText(value)) for (name, value) in attributes))
+		self.generator.characters(decodeText(text))
+		self.generator.endElement(tag)
+	
+	# Finish the file, and return its path
+	def close(self):
+		self.generator.ignorableWhitespace("\n")
+		self.generator.endDocument()
+		self.file.close()
+		counters.countWrite(os.path.getsize(self.path))
+		return self.path
+	
+# Finds documented names in text. At each position, the longest name that
+# starts there wins, and the search carries on after the end of that name.
+class SymbolMatcher(object):
+	def __init__(self, names):
+		# Build a trie of the names, where the None key marks the end of a name
+		self.trie = {}
+		for name in names:
+			node = self.trie
+			for character in name:
+				node = node.setdefault(character, {})
+			node[None] = name
+		
+		# A match can only start with the first character of some name
+		self.startPattern = None
+		if self.trie:
+			self.startPattern = re.compile("[" + "".join(re.escape(character) for character in self.trie) + "]")
+	
+	# Yield the (start, end) of each match in text, from left to right
+	def matches(self, text):
+		if self.startPattern is None:
+			return
+		
+		position = 0
+		while True:
+			startMatch = self.startPattern.search(text, position)
+			if not startMatch:
+				return
+			start = startMatch.start()
 			
-			# Create a <name> element
-			nameElement = indexXML.createElement("name")
-			objectElement.appendChild(nameElement)
-			nameText = indexXML.createTextNode(objectName)
-			nameElement.appendChild(nameText)
+			# Walk down the trie as far as the text allows
+			node = self.trie
+			end = None
+			index = start
+			while index < len(text):
+				node = node.get(text[index])
+				if node is None:
+					break
+				index += 1
+				if None in node:
+					end = index
 			
-	# Write the index file
-	f = open(outputPath, "w")
-	indexXML.writexml(f, "", "\t", "\n")
+			if end:
+				yield (start, end)
+				position = end
+			else:
+				position = start + 1
+
+# Read a framework symbol table, returning its framework name and link targets
+# Tables are plain text, with one entry per line:
+#	symbols 1				The format version, which must come first
+#	framework <name>		The name of the framework
+#	url <template>			The link target for the names that follow it,
+#							where {name} is replaced by each name
+#	<name>					A class or protocol in the framework
+# Blank lines and lines starting with # are ignored
+def readSymbolTable(path):
+	frameworkName = os.path.splitext(os.path.basename(path))[0]
+	targets = {}
+	target = None
+	version = None
+	
+	f = open(path, "rb")
+	for (lineNumber, line) in enumerate(f):
+		line = line.decode("utf-8").strip()
+		if not line or line.startswith("#"):
+			continue
+		
+		if version is None:
+			if line != "symbols 1":
+				raise ValueError("%s is not a version 1 symbol table" % path)
+			version = 1
+		elif line.startswith("framework "):
+			frameworkName = line[len("framework "):].strip()
+		elif line.startswith("url "):
+			target = line[len("url "):].strip()
+		elif target is None:
+			raise ValueError("%s, line %d: %s has no url" % (path, lineNumber + 1, line))
+		else:
+			targets[line] = target
 	f.close()
+	counters.countRead(os.path.getsize(path))
+	
+	return (frameworkName, targets)
+
+# The symbol tables to link against: the built-in tables for the platform,
+# followed by any the user added, which take precedence
+def symbolTablePaths(shouldEstablishIPhoneLinks, userPaths):
+	platform = "mac"
+	if shouldEstablishIPhoneLinks:
+		platform = "iphone"
 	
-	return outputPath
+	paths = []
+	for path in [os.path.join(scriptDirectory, "frameworks", platform)] + (userPaths or []):
+		if os.path.isdir(path):
+			tableNames = sorted(fileName for fileName in os.listdir(path) if fileName.endswith(".symbols"))
+			paths.extend(os.path.join(path, fileName) for fileName in tableNames)
+		else:
+			paths.append(path)
+	return paths
+
+# Every name that can be linked to, and its link target.
+# When names collide, objects in the project win over objects in other
+# projects built with it, which win over framework symbols. Classes win
+# over protocols, and protocols over categories. Between frameworks, the
+# table added last wins. Each collision is kept so it can be reported.
+# The table is built once per run, and shared by everything that resolves
+# names. Its matcher is only built when first needed.
+class SymbolTable(object):
+	# Lower ranks win
+	projectRank = 3
+	frameworkRank = 6
+	kindRanks = {
+		"class": 0,
+		"protocol": 1,
+		"category": 2
+	}
+	
+	def __init__(self):
+		self.targets = {}
+		self.origins = {}
+		self.collisions = []
+		self.matcher = None
+	
+	def add(self, name, target, origin, rank):
+		if name in self.origins:
+			(existingOrigin, existingRank) = self.origins[name]
+			if rank > existingRank:
+				if target != self.targets[name]:
+					self.collisions.append((name, existingOrigin, origin))
+				return
+			if target != self.targets[name]:
+				self.collisions.append((name, origin, existingOrigin))
+		
+		self.targets[name] = target
+		self.origins[name] = (origin, rank)
+		self.matcher = None
+	
+	def addFramework(self, frameworkName, targets):
+		for (name, target) in targets.items():
+			self.add(name, target, "the %s framework" % frameworkName, self.frameworkRank)
+	
+	# projectName is given for the objects of one of the projects of a
+	# multi-project build, which are linked to from the other projects
+	def addObjects(self, documentedObjects, projectName=None):
+		for doxygenObject in documentedObjects:
+			kindDirectory = directoryForKind[doxygenObject.kind]
+			rank = self.kindRanks[doxygenObject.kind]
+			if projectName is None:
+				self.add(doxygenObject.name, "../" + kindDirectory + "/{name}", "the project's " + doxygenObject.kind, rank)
+			else:
+				# Projects are built side by side, so this leads from a page
+				# in one project's html directory to a page in another's
+				target = "../../../" + decodeText(projectName) + "/html/" + kindDirectory + "/{name}"
+				self.add(doxygenObject.name, target, "the %s project's %s" % (projectName, doxygenObject.kind), self.projectRank + rank)
 	
-def linkify(directory, shouldEstablishIPhoneLinks):
-	indexFile = minidom.parse(os.path.join(directory, "index.xml"))
-	documentedObjects = indexFile.getElementsByTagName("name")
+	def update(self, symbolTable):
+		self.collisions.extend(symbolTable.collisions)
+		for (name, (origin, rank)) in symbolTable.origins.items():
+			self.add(name, symbolTable.targets[name], origin, rank)
 	
+	def target(self, name):
+		if name not in self.targets:
+			return None
+		return self.targets[name].format(name=name)
+	
+	# Yield the (start, end) of each name in text, as SymbolMatcher does
+	def matches(self, text):
+		if self.matcher is None:
+			self.matcher = SymbolMatcher(self.targets)
+		return self.matcher.matches(text)
+
+def frameworkSymbolTable(tablePaths):
 	global verbose
 	
-	# Get each file
-	for (path, dirs, files) in os.walk(directory):
-		for fileName in files:
-			# Skip the index and any non-xml files
-			if fileName == "index.xml" or not os.path.splitext(fileName)[1] == ".xml":
-				continue
-			
-			filePath = os.path.join(path, fileName)
-			
-			if verbose:
-				print "Linkifying " + fileName
+	symbolTable = SymbolTable()
+	for path in tablePaths:
+		(frameworkName, targets) = readSymbolTable(path)
+		if verbose:
+			print("Establishing links to " + frameworkName)
+		symbolTable.addFramework(frameworkName, targets)
+	
+	return symbolTable
+
+# Build the table of link targets for the project's objects,
+# on top of the framework symbols
+def linkSymbolTable(frameworkSymbols, documentedObjects):
+	symbolTable = SymbolTable()
+	symbolTable.update(frameworkSymbols)
+	symbolTable.addObjects(documentedObjects)
+	return symbolTable
+
+# Build the table of link targets shared by the projects of a multi-project
+# build, on top of the framework symbols. projects holds the name and
+# documented objects of each project.
+def projectsSymbolTable(frameworkSymbols, projects):
+	symbolTable = SymbolTable()
+	symbolTable.update(frameworkSymbols)
+	for (projectName, documentedObjects) in projects:
+		symbolTable.addObjects(documentedObjects, projectName)
+	return symbolTable
+
+# One project's view of the table shared by the projects of a multi-project
+# build. The project's own objects link within the project, and win over
+# the objects of the same name in other projects. The shared table already
+# has every name, so its matcher is shared too.
+class ProjectSymbolTable(object):
+	def __init__(self, symbolTable, documentedObjects):
+		self.symbolTable = symbolTable
+		self.localSymbols = SymbolTable()
+		self.localSymbols.addObjects(documentedObjects)
+		self.collisions = self.localSymbols.collisions
+	
+	def target(self, name):
+		if name in self.localSymbols.targets:
+			return self.localSymbols.target(name)
+		return self.symbolTable.target(name)
+	
+	def matches(self, text):
+		return self.symbolTable.matches(text)
+
+# Return those of names whose link targets differ between two symbol tables
+def changedTargets(previousSymbolTable, symbolTable, names):
+	return set(name for name in names if previousSymbolTable.target(name) != symbolTable.target(name))
+
+# Add text to element after the given list of its new children
+def appendText(element, children, text):
+	if not text:
+		return
+	if children:
+		children[-1].tail = (children[-1].tail or "") + text
+	else:
+		element.text = (element.text or "") + text
+
+# Replace each <ref> element under element with its contents
+def removeRefs(element):
+	children = []
+	for child in element:
+		removeRefs(child)
+		if child.tag == "ref":
+			appendText(element, children, child.text)
+			children.extend(child)
+			appendText(element, children, child.tail)
+		else:
+			children.append(child)
+	
+	element[:] = children
+
+# Split text around the documented names in it, returning the text before
+# the first name and a <ref> element for each name, which holds the text
+# up to the next name as its tail
+# Empty pieces become None, so that no empty text nodes end up in the tree
+def linkText(text, symbolTable, links):
+	if not text:
+		return (text, [])
+	
+	refs = []
+	leadingText = text
+	position = 0
+	for (start, end) in symbolTable.matches(text):
+		name = text[start:end]
+		if refs:
+			refs[-1].tail = text[position:start] or None
+		else:
+			leadingText = text[:start] or None
+		
+		refNode = etree.Element("ref")
+		refNode.set("id", symbolTable.target(name))
+		refNode.text = name
+		refs.append(refNode)
+		links.add(name)
+		position = end
+	
+	if refs:
+		refs[-1].tail = text[position:] or None
+	return (leadingText, refs)
+
+# Link the text of element and everything under it, in a single pass
+def linkElement(element, symbolTable, links):
+	(element.text, children) = linkText(element.text, symbolTable, links)
+	for child in list(element):
+		linkElement(child, symbolTable, links)
+		(child.tail, refs) = linkText(child.tail, symbolTable, links)
+		children.append(child)
+		children.extend(refs)
+	
+	element[:] = children
+
+def linkify(doxygenObject, symbolTable):
+	global verbose
+	
+	if verbose:
+		print("Linkifying " + os.path.split(doxygenObject.path)[1])
+	
+	objectElement = doxygenObject.loadDocument().getroot()
+	
+	# Remove all refs initially
+	# We will recreate them ourselves
+	removeRefs(objectElement)
+	
+	# Link every documented name, except within the top-level <name> and
+	# <file> elements, since an object shouldn't link to itself there
+	# <name> and <file> are linked in other contexts (ie: inheritance lists)
+	links = set()
+	(objectElement.text, children) = linkText(objectElement.text, symbolTable, links)
+	for child in list(objectElement):
+		if child.tag not in ("name", "file"):
+			linkElement(child, symbolTable, links)
+		(child.tail, refs) = linkText(child.tail, symbolTable, links)
+		children.append(child)
+		children.extend(refs)
+	objectElement[:] = children
+	doxygenObject.links = sorted(links)
+
+	# Write the xml file
+	doxygenObject.save()
 			
-			f = open(filePath, "r")
-			fileContents = f.read()
+# Native HTML renderer
+# Produces the same markup as object2html.xslt without running a stylesheet.
+# Each template in the stylesheet has a counterpart below, which adds
+# (tag, attributes, children) tuples to a page tree. The tree is then
+# serialized the way libxml2 serializes HTML, in one pass per page.
+
+# For each element libxml2 knows: (empty, inline, end tag omitted when empty)
+# Line breaks go around elements that aren't inline, and never around
+# elements it doesn't know, such as the HTML 5 sectioning elements
+htmlElements = {
+	"a": (False, True, False),
+	"body": (False, False, False),
+	"button": (False, True, False),
+	"code": (False, True, False),
+	"dd": (False, False, False),
+	"div": (False, False, False),
+	"dl": (False, False, False),
+	"dt": (False, False, False),
+	"h1": (False, False, False),
+	"h2": (False, False, False),
+	"h3": (False, False, False),
+	"h5": (False, False, False),
+	"head": (False, False, False),
+	"hr": (True, False, False),
+	"html": (False, False, False),
+	"input": (True, True, False),
+	"li": (False, False, True),
+	"link": (True, False, False),
+	"meta": (True, False, False),
+	"option": (False, False, False),
+	"p": (False, False, False),
+	"pre": (False, False, False),
+	"script": (False, True, False),
+	"select": (False, True, False),
+	"span": (False, True, False),
+	"table": (False, False, False),
+	"td": (False, False, False),
+	"th": (False, False, False),
+	"title": (False, False, False),
+	"tr": (False, False, False),
+	"ul": (False, False, False)
+}
+
+# Characters libxml2 leaves alone when it escapes the URI attributes of
+# HTML output. Since 2.11 it only escapes whitespace, control characters
+# and non-ASCII text. The renderer escapes them the same way as the libxml2
+# that applies the stylesheets, so that both produce the same markup.
+legacyURISafeCharacters = "-_.!~*'()@/:=?;#%&,+"
+uriSafeCharacters = "".join(chr(code) for code in range(33, 127))
+
+libxmlVersion = None
+
+def findLibxmlVersion():
+	global libxmlVersion
+	
+	if libxmlVersion is None:
+		if haveLXML:
+			libxmlVersion = etree.LIBXML_VERSION
+		else:
+			# xsltproc reports the libxml2 it uses as "Using libxml 21406, ..."
+			libxmlVersion = ()
+			try:
+				counters.subprocesses += 1
+				output = subprocess.check_output(["xsltproc", "--version"])
+				match = re.search(b"libxml ([0-9]+)", output)
+				if match:
+					number = int(match.group(1))
+					libxmlVersion = (number // 10000, number // 100 % 100, number % 100)
+			except (OSError, subprocess.CalledProcessError):
+				pass
+	return libxmlVersion
+
+def escapeHTML(text):
+	return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def quoteAttribute(name, value):
+	value = escapeHTML(value)
+	if name in ("href", "src"):
+		safeCharacters = uriSafeCharacters
+		if findLibxmlVersion() < (2, 11):
+			safeCharacters = legacyURISafeCharacters
+		value = quote(value.lstrip(" \t\r\n").encode("utf-8"), safeCharacters)
+	
+	if '"' not in value:
+		return '"' + value + '"'
+	elif "'" not in value:
+		return "'" + value + "'"
+	return '"' + value.replace('"', "&quot;") + '"'
+
+def writeHTML(node, parentTag, nextNode, output):
+	(tag, attributes, children) = node
+	info = htmlElements.get(tag)
+	
+	output.append("<" + tag)
+	for (name, value) in attributes:
+		output.append(" " + name + "=" + quoteAttribute(name, value))
+	
+	if info and info[0]:
+		output.append(">")
+	elif not children:
+		if info and info[2]:
+			output.append(">")
+		else:
+			output.append("></" + tag + ">")
+	else:
+		output.append(">")
+		breakLines = info is not None and not info[1] and len(children) > 1 and tag[0] != "p"
+		if breakLines and not isinstance(children[0], stringTypes):
+			output.append("\n")
+		for (index, child) in enumerate(children):
+			if not isinstance(child, stringTypes):
+				nextChild = None
+				if index + 1 < len(children):
+					nextChild = children[index + 1]
+				writeHTML(child, tag, nextChild, output)
+			elif tag == "script":
+				output.append(child)
+			else:
+				output.append(escapeHTML(child))
+		if breakLines and not isinstance(children[-1], stringTypes):
+			output.append("\n")
+		output.append("</" + tag + ">")
+	
+	if info is not None and not info[1] and nextNode is not None and not isinstance(nextNode, stringTypes) and parentTag[0] != "p":
+		output.append("\n")
+
+# Add text to a list of children, merging it with any text before it
+def addText(children, text):
+	if text:
+		if children and isinstance(children[-1], stringTypes):
+			children[-1] += text
+		else:
+			children.append(text)
+
+# Add an element to a list of children, and return the element's children
+def addElement(children, tag, attributes=()):
+	element = (tag, list(attributes), [])
+	children.append(element)
+	return element[2]
+
+def stringValue(element):
+	if element is None:
+		return ""
+	return "".join(element.itertext())
+
+def normalizeSpace(text):
+	return re.sub("[ \t\r\n]+", " ", text).strip(" ")
+
+# The built-in template: copy text, and apply templates to child elements
+def renderChildren(element, ancestors, objectName, children):
+	ancestors = ancestors + (element.tag,)
+	addText(children, element.text)
+	for child in element:
+		renderElement(child, ancestors, objectName, children)
+		addText(children, child.tail)
+
+def renderElement(element, ancestors, objectName, children):
+	tag = element.tag
+	parentTag = ancestors[-1]
+	
+	if tag == "para":
+		renderChildren(element, ancestors, objectName, addElement(children, "p"))
+	elif tag == "code":
+		renderChildren(element, ancestors, objectName, addElement(children, "code"))
+	elif tag == "list":
+		renderChildren(element, ancestors, objectName, addElement(children, "ul"))
+	elif tag == "item" and parentTag == "list":
+		renderChildren(element, ancestors, objectName, addElement(children, "li"))
+	elif tag == "item" and parentTag == "seeAlso":
+		href = "#" + normalizeSpace(stringValue(element).replace("-", "").replace("+", ""))
+		listItem = addElement(children, "li")
+		renderChildren(element, ancestors, objectName, addElement(addElement(listItem, "code"), "a", [("href", href)]))
+	elif tag == "ref":
+		renderRef(element, ancestors, objectName, children)
+	elif tag == "codeblock":
+		renderChildren(element, ancestors, objectName, addElement(addElement(children, "code"), "pre"))
+	elif tag == "parameter" and parentTag == "prototype":
+		renderChildren(element, ancestors, objectName, addElement(children, "span", [("class", "parameter")]))
+	elif tag == "parameters":
+		addText(addElement(children, "h5"), "Parameters")
+		renderChildren(element, ancestors, objectName, addElement(children, "dl", [("class", "parameterList")]))
+	elif tag == "param":
+		ancestors = ancestors + ("param",)
+		for (childTag, htmlTag) in (("name", "dt"), ("description", "dd")):
+			htmlChildren = addElement(children, htmlTag)
+			for child in element.iterfind(childTag):
+				renderElement(child, ancestors, objectName, htmlChildren)
+	elif tag == "return":
+		addText(addElement(children, "h5"), "Return Value")
+		renderChildren(element, ancestors, objectName, children)
+	elif tag == "details" and ancestors[-2:] == ("member", "description"):
+		firstParagraph = element.find("para")
+		if firstParagraph is not None and stringValue(firstParagraph) != "":
+			addText(addElement(children, "h5"), "Discussion")
+			renderChildren(element, ancestors, objectName, children)
+	elif tag == "warning" and parentTag == "member":
+		addText(addElement(children, "h5"), "Warning")
+		renderChildren(element, ancestors, objectName, children)
+	elif tag == "bug" and parentTag == "member":
+		addText(addElement(children, "h5"), "Bug")
+		renderChildren(element, ancestors, objectName, children)
+	elif tag == "seeAlso":
+		addText(addElement(children, "h5"), "See Also")
+		seeAlsoList = addElement(children, "ul", [("class", "seeAlso")])
+		for item in element.iterfind("item"):
+			renderElement(item, ancestors + ("seeAlso",), objectName, seeAlsoList)
+	elif tag == "file" and parentTag == "member":
+		addText(addElement(children, "h5"), "Declared In")
+		renderChildren(element, ancestors, objectName, addElement(children, "code"))
+	else:
+		renderChildren(element, ancestors, objectName, children)
+
+def renderRef(element, ancestors, objectName, children):
+	# Don't put the <code> tag for links inside a prototype or codeblock
+	if "prototype" not in ancestors and "codeblock" not in ancestors:
+		children = addElement(children, "code")
+	
+	# Don't link an object to itself
+	firstChild = None
+	if element.text:
+		firstChild = element.text
+	elif len(element):
+		firstChild = stringValue(element[0])
+	if objectName is not None and firstChild is not None and firstChild != objectName:
+		children = addElement(children, "a", [("href", (element.get("id") or "") + ".html")])
+	
+	renderChildren(element, ancestors, objectName, children)
+
+# Apply templates to the name of an element, in the default mode
+def renderName(element, ancestors, objectName, children):
+	for nameElement in element.iterfind("name"):
+		renderElement(nameElement, ancestors + (element.tag,), objectName, children)
+
+def renderProtocols(superclass, ancestors, objectName, children):
+	className = superclass.find("name")
+	ancestors = ancestors + ("superclass",)
+	for protocol in superclass.iterfind("conformsTo/protocol"):
+		listItem = addElement(children, "li")
+		renderName(protocol, ancestors + ("conformsTo",), objectName, listItem)
+		if className is not None:
+			addText(listItem, " (" + stringValue(className) + ")")
+	
+	for nestedSuperclass in superclass.iterfind("superclass"):
+		renderProtocols(nestedSuperclass, ancestors, objectName, children)
+
+def hasContent(element):
+	return len(element) > 0 or (element.text is not None and element.text.strip(" \t\r\n") != "")
+
+# The sections for the table of contents, the jump list and the definitions
+memberGroups = (
+	("property", "properties", "Properties", "tocProperties"),
+	("class-method", "classMethods", "Class Methods", "tocClassMethods"),
+	("instance-method", "instanceMethods", "Instance Methods", "tocInstanceMethods")
+)
+
+def renderObjectHTML(document, projectName):
+	projectName = decodeText(projectName)
+	objectElement = document.getroot()
+	objectName = None
+	if objectElement.find("name") is not None:
+		objectName = stringValue(objectElement.find("name"))
+	root = ("object",)
+	
+	title = "".join(stringValue(nameElement) for nameElement in objectElement.iterfind("name"))
+	title += {"class": " Class", "category": " Category", "protocol": " Protocol"}.get(objectElement.get("kind"), "")
+	title += " Reference"
+	
+	description = objectElement.find("description")
+	hasOverview = description is not None and (description.find("brief") is not None or description.find("details") is not None)
+	sections = objectElement.find("sections")
+	hasTasks = sections is not None and sections.find("section") is not None
+	members = objectElement.findall("sections/section/member")
+	memberAncestors = ("object", "sections", "section")
+	
+	html = ("html", [], [])
+	head = addElement(html[2], "head")
+	addElement(head, "meta", [("http-equiv", "Content-Type"), ("content", "text/html; charset=UTF-8")])
+	addElement(head, "meta", [("charset", "UTF-8")])
+	addText(addElement(head, "title"), title)
+	addElement(head, "meta", [("id", "Generator"), ("name", "Generator"), ("content", "Doxyclean")])
+	addElement(head, "meta", [("id", "GeneratorVersion"), ("name", "GeneratorVersion"), ("content", "2.2")])
+	addElement(head, "link", [("rel", "stylesheet"), ("type", "text/css"), ("href", "../css/common.css")])
+	addElement(head, "link", [("rel", "stylesheet"), ("type", "text/css"), ("media", "screen"), ("href", "../css/screen.css")])
+	addElement(head, "link", [("rel", "stylesheet"), ("type", "text/css"), ("media", "print"), ("href", "../css/print.css")])
+	addElement(head, "script", [("type", "text/javascript"), ("src", "../js/common.js")])
+	addElement(head, "script", [("type", "text/javascript"), ("src", "../js/search.js")])
+	
+	body = addElement(html[2], "body")
+	header = addElement(addElement(body, "header", [("id", "projectHeader")]), "h1")
+	addText(addElement(header, "a", [("href", "../index.html")]), projectName + " Reference Library")
+	searchBox = addElement(body, "nav", [("id", "search")])
+	addElement(searchBox, "input", [("type", "search"), ("id", "searchField"), ("placeholder", "Search"), ("autocomplete", "off"), ("oninput", "search(this.value)")])
+	addElement(searchBox, "ul", [("id", "searchResults"), ("style", "display: none;")])
+	header = addElement(addElement(body, "header", [("id", "fileHeader")]), "h1")
+	addText(addElement(header, "a", [("href", "#classTitle")]), title)
+	
+	# Jump To... List
+	buttons = addElement(addElement(body, "nav", [("id", "buttons")]), "ul")
+	addText(addElement(addElement(buttons, "li", [("id", "toc_button")]), "button", [("id", "table_of_contents"), ("onclick", "toggleTOC()")]), "Table of Contents")
+	jumpList = addElement(addElement(buttons, "li", [("id", "jumpto_button")]), "select", [("id", "jumpto"), ("onchange", "jumpTo()")])
+	addText(addElement(jumpList, "option", [("value", "classTitle")]), "Jump To...")
+	if hasOverview:
+		addText(addElement(jumpList, "option", [("value", "overview")]), "Overview")
+	if hasTasks:
+		addText(addElement(jumpList, "option", [("value", "tasks")]), "Tasks")
+	for (kind, sectionID, sectionTitle, tocID) in memberGroups:
+		groupMembers = [member for member in members if member.get("kind") == kind]
+		if groupMembers:
+			addText(addElement(jumpList, "option", [("value", sectionID)]), sectionTitle)
+		for member in groupMembers:
+			memberName = stringValue(member.find("name"))
+			prefix = {"class-method": "+ ", "instance-method": "- "}.get(kind, "")
+			addText(addElement(jumpList, "option", [("value", memberName)]), u"\u00a0\u00a0\u00a0\u00a0" + prefix + memberName)
+	
+	# Table of Contents
+	tableOfContents = addElement(addElement(body, "nav", [("id", "tableOfContents"), ("style", "display: none;")]), "ul")
+	if hasOverview:
+		addText(addElement(addElement(tableOfContents, "li"), "a", [("href", "#overview")]), "Overview")
+	if hasTasks:
+		listItem = addElement(tableOfContents, "li", [("class", "expandable"), ("id", "tocTasks"), ("onclick", "toggleTOCItem()")])
+		addText(addElement(listItem, "a", [("href", "#tasks")]), "Tasks")
+		sublist = addElement(listItem, "ul", [("style", "display: none;")])
+		for section in sections.iterfind("section"):
+			href = "#" + normalizeSpace(stringValue(section.find("name"))).replace(" ", "_")
+			renderName(section, ("object", "sections"), objectName, addElement(addElement(sublist, "li"), "a", [("href", href)]))
+	for (kind, sectionID, sectionTitle, tocID) in memberGroups:
+		groupMembers = [member for member in members if member.get("kind") == kind]
+		if groupMembers:
+			listItem = addElement(tableOfContents, "li", [("class", "expandable"), ("id", tocID), ("onclick", "toggleTOCItem()")])
+			addText(addElement(listItem, "a", [("href", "#" + sectionID)]), sectionTitle)
+			sublist = addElement(listItem, "ul", [("style", "display: none;")])
+			for member in groupMembers:
+				renderName(member, memberAncestors, objectName, addElement(addElement(sublist, "li"), "a", [("href", "#" + stringValue(member.find("name")))]))
+	
+	contents = addElement(body, "div", [("id", "contents")])
+	addText(addElement(contents, "h1", [("id", "classTitle")]), title)
+	
+	# Info Table
+	superclasses = [superclass for superclass in objectElement.iterfind("superclass") if hasContent(superclass)]
+	hasInheritance = len(superclasses) > 0
+	hasProtocolConformance = objectElement.find("conformsTo/protocol") is not None or objectElement.find("superclass/conformsTo/protocol") is not None
+	metadata = addElement(contents, "table", [("id", "metadata")])
+	if hasInheritance:
+		row = addElement(metadata, "tr", [("class", "alt")])
+		addText(addElement(row, "th"), "Inherits from")
+		inheritanceList = addElement(addElement(row, "td"), "ul", [("class", "inheritance")])
+		for superclass in superclasses:
+			renderName(superclass, root, objectName, addElement(inheritanceList, "li"))
+	if hasProtocolConformance:
+		attributes = []
+		if not hasInheritance:
+			attributes.append(("class", "alt"))
+		row = addElement(metadata, "tr", attributes)
+		addText(addElement(row, "th"), "Conforms to")
+		protocolList = addElement(addElement(row, "td"), "ul")
+		for protocol in objectElement.iterfind("conformsTo/protocol"):
+			renderName(protocol, ("object", "conformsTo"), objectName, addElement(protocolList, "li"))
+		for superclass in superclasses:
+			renderProtocols(superclass, root, objectName, protocolList)
+	attributes = []
+	if hasInheritance == hasProtocolConformance:
+		attributes.append(("class", "alt"))
+	row = addElement(metadata, "tr", attributes)
+	addText(addElement(row, "th"), "Declared in")
+	fileCell = addElement(row, "td")
+	for fileElement in objectElement.iterfind("file"):
+		renderChildren(fileElement, root, objectName, fileCell)
+	
+	# Overview
+	if hasOverview:
+		addText(addElement(contents, "h2", [("id", "overview")]), "Overview")
+		for childTag in ("brief", "details"):
+			for child in description.iterfind(childTag):
+				renderChildren(child, ("object", "description"), objectName, contents)
+	
+	# Sections
+	if hasTasks:
+		addText(addElement(contents, "h2", [("id", "tasks")]), "Tasks")
+		tasksList = addElement(contents, "ul", [("id", "tasksList")])
+		addText(tasksList, sections.text)
+		for section in sections:
+			if section.tag != "section":
+				renderElement(section, ("object", "sections"), objectName, tasksList)
+			elif section.find("member") is not None:
+				sectionID = normalizeSpace(stringValue(section.find("name"))).replace(" ", "_")
+				sectionItem = addElement(tasksList, "li", [("id", sectionID)])
+				renderName(section, ("object", "sections"), objectName, addElement(sectionItem, "h3"))
+				methodList = addElement(sectionItem, "ul", [("class", "methods")])
+				for member in section.iterfind("member"):
+					renderMemberIndex(member, memberAncestors, objectName, methodList)
+			addText(tasksList, section.tail)
+	
+	# Definition Sections
+	for (kind, sectionID, sectionTitle, tocID) in memberGroups:
+		groupMembers = [member for member in members if member.get("kind") == kind]
+		if groupMembers:
+			definitions = addElement(contents, "section", [("id", sectionID)])
+			addText(addElement(definitions, "h2"), sectionTitle)
+			for member in groupMembers:
+				renderMemberDetails(member, memberAncestors, objectName, definitions)
+	
+	addElement(contents, "hr")
+	today = time.localtime()
+	addText(addElement(contents, "p", [("id", "lastUpdated")]), "Last updated: %d-%d-%d" % (today.tm_year, today.tm_mon, today.tm_mday))
+	
+	breadcrumbs = addElement(addElement(body, "footer", [("id", "breadcrumbs")]), "ul")
+	addText(addElement(addElement(breadcrumbs, "li"), "a", [("href", "../index.html")]), projectName)
+	addText(addElement(addElement(breadcrumbs, "li"), "a", [("href", "#classTitle")]), title)
+	
+	output = ["<!DOCTYPE html>"]
+	writeHTML(html, "", None, output)
+	output.append("\n")
+	return u"".join(output).encode("utf-8")
+
+def renderMemberIndex(member, ancestors, objectName, children):
+	memberName = stringValue(member.find("name"))
+	kind = member.get("kind")
+	
+	listItem = addElement(children, "li")
+	tooltipRegion = addElement(listItem, "span", [("class", "tooltipRegion")])
+	link = addElement(addElement(tooltipRegion, "code"), "a", [("href", "#" + memberName)])
+	addText(link, {"class-method": "+ ", "instance-method": "- "}.get(kind, ""))
+	renderName(member, ancestors, objectName, link)
+	if kind == "property":
+		addText(tooltipRegion, " ")
+		addText(addElement(tooltipRegion, "span", [("class", "specialType")]), "property")
+	elif member.get("optional") == "no":
+		addText(tooltipRegion, " ")
+		addText(addElement(tooltipRegion, "span", [("class", "specialType")]), "required")
+	addText(addElement(listItem, "span", [("class", "tooltip")]), stringValue(member.find("description/brief")))
+
+# Method/Property Documentation
+def renderMemberDetails(member, ancestors, objectName, children):
+	memberName = stringValue(member.find("name"))
+	memberAncestors = ancestors + ("member",)
+	
+	definition = addElement(children, "section", [("class", "definition"), ("id", memberName)])
+	addText(addElement(definition, "h3"), memberName)
+	for brief in member.iterfind("description/brief"):
+		renderChildren(brief, memberAncestors + ("description",), objectName, definition)
+	declaration = addElement(definition, "code", [("class", "methodDeclaration")])
+	for prototype in member.iterfind("prototype"):
+		renderChildren(prototype, memberAncestors, objectName, declaration)
+	for childPath in ("parameters", "return", "description/details", "warning", "bug", "seeAlso", "file"):
+		childAncestors = memberAncestors
+		if childPath == "description/details":
+			childAncestors = memberAncestors + ("description",)
+		for child in member.iterfind(childPath):
+			renderElement(child, childAncestors, objectName, definition)
+
+# Compressed output
+# With --compress, each page and stylesheet is minified as it is written,
+# and gzip and brotli versions are written beside it, so that a static
+# file server can send whichever one the browser accepts.
+
+# Elements whose contents are kept exactly as they are
+preformattedElements = set(["pre", "script", "style", "textarea"])
+
+# Elements laid out within a line of text, where the spaces around them show.
+# Spaces next to any other element are dropped.
+inlineElements = set(["a", "abbr", "b", "br", "button", "cite", "code", "em", "i", "img", "input", "kbd", "label", "q", "samp", "select", "small", "span", "strong", "sub", "sup", "tt", "u", "var"])
+
+htmlTokenPattern = re.compile(r"""(<!--.*?-->|<(?:"[^"]*"|'[^']*'|[^'">])*>)""", re.S)
+tagNamePattern = re.compile(r"<(/?)([a-zA-Z0-9]+)")
+whitespacePattern = re.compile(r"[ \t\r\n]+")
+
+def isInlineTag(token):
+	match = tagNamePattern.match(token)
+	return match is not None and match.group(2).lower() in inlineElements
+
+def minifyHTML(output):
+	# Splitting on the pattern alternates between text and tags
+	tokens = htmlTokenPattern.split(output)
+	minified = []
+	preformattedDepth = 0
+	for (index, token) in enumerate(tokens):
+		if index % 2:
+			if token.startswith("<!--"):
+				continue
+			match = tagNamePattern.match(token)
+			if match and match.group(2).lower() in preformattedElements:
+				preformattedDepth += -1 if match.group(1) else 1
+			minified.append(token)
+		elif preformattedDepth > 0:
+			minified.append(token)
+		else:
+			text = whitespacePattern.sub(" ", token)
+			if text == " " and not (index > 0 and isInlineTag(tokens[index - 1]) and index < len(tokens) - 1 and isInlineTag(tokens[index + 1])):
+				continue
+			minified.append(text)
+	return "".join(minified)
+
+cssTokenPattern = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|/\*.*?\*/)""", re.S)
+cssStringPattern = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""", re.S)
+cssSeparatorPattern = re.compile(r" ?([{};,>]) ?")
+
+def removeCSSComment(match):
+	if match.group(1).startswith("/*"):
+		return " "
+	return match.group(1)
+
+def minifyCSS(output):
+	# Remove the comments first, so that the whitespace on either side of
+	# each one is collapsed together. Strings that look like comments stay.
+	output = cssTokenPattern.sub(removeCSSComment, output)
+	
+	# Splitting on the pattern alternates between rules and strings
+	tokens = cssStringPattern.split(output)
+	minified = []
+	for (index, token) in enumerate(tokens):
+		if index % 2:
+			minified.append(token)
+		else:
+			rules = cssSeparatorPattern.sub(r"\1", whitespacePattern.sub(" ", token))
+			minified.append(rules.replace(";}", "}"))
+	return "".join(minified).strip()
+
+minifiers = {
+	".html": minifyHTML,
+	".css": minifyCSS
+}
+
+def compressedPaths(outputPath):
+	return [outputPath + ".gz", outputPath + ".br"]
+
+def gzipCompress(output):
+	buffer = io.BytesIO()
+	# A fixed timestamp keeps the output the same from one run to the next
+	f = gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9, mtime=0)
+	f.write(output)
+	f.close()
+	return buffer.getvalue()
+
+# Write one file of the HTML output, with its compressed versions if asked
+def writeOutputFile(outputPath, output, compress=False):
+	outputs = [(outputPath, output)]
+	if compress:
+		minifier = minifiers.get(os.path.splitext(outputPath)[1])
+		if minifier:
+			output = minifier(output.decode("utf-8")).encode("utf-8")
+		outputs = [(outputPath, output), (outputPath + ".gz", gzipCompress(output))]
+		if haveBrotli:
+			outputs.append((outputPath + ".br", brotli.compress(output, mode=brotli.MODE_TEXT)))
+	
+	for (path, contents) in outputs:
+		f = openOutputFile(path)
+		f.write(contents)
+		f.close()
+		counters.countWrite(len(contents))
+
+# Copy the CSS and JavaScript files that every page shares
+def copyAssets(htmlOutputDirectory, compress=False):
+	for assetDirectory in ("css", "js"):
+		assetPath = os.path.join(scriptDirectory, assetDirectory)
+		outputDirectory = os.path.join(htmlOutputDirectory, assetDirectory)
+		_mkdir(outputDirectory)
+		for fileName in os.listdir(assetPath):
+			f = open(os.path.join(assetPath, fileName), "rb")
+			contents = f.read()
 			f.close()
-			
-			# Remove all refs initially
-			# We will recreate them ourselves
-			fileContents = re.sub("\\<ref(?: .*)?\\>(.*?)\\</ref\\>", "\\1", fileContents);
-			
-			documentedTargets = {}
-			
-			if not shouldEstablishIPhoneLinks:
-				if verbose:
-					print "Establishing links to Foundation"
-				macFoundationClasses = [
-					"NSAffineTransform",
-					"NSAppleEventDescriptor",
-					"NSAppleEventManager",
-					"NSAppleScript",
-					"NSArchiver",
-					"NSArray",
-					"NSAssertionHandler",
-					"NSAttributedString",
-					"NSAutoreleasePool",
-					"NSBlockOperation",
-					"NSBundle",
-					"NSCachedURLResponse",
-					"NSCalendar",
-					"NSCharacterSet",
-					"NSClassDescription",
-					"NSCloneCommand",
-					"NSCloseCommand",
-					"NSCoder",
-					"NSComparisonPredicate",
-					"NSCompoundPredicate",
-					"NSCondition",
-					"NSConditionLock",
-					"NSConnection",
-					"NSCountCommand",
-					"NSCountedSet",
-					"NSCreateCommand",
-					"NSData",
-					"NSDate",
-					"NSDateComponents",
-					"NSDateFormatter",
-					"NSDecimalNumber",
-					"NSDecimalNumberHandler",
-					"NSDeleteCommand",
-					"NSDeserializer",
-					"NSDictionary",
-					"NSDirectoryEnumerator",
-					"NSDistantObject",
-					"NSDistantObjectRequest",
-					"NSDistributedLock",
-					"NSDistributedNotificationCenter",
-					"NSEnumerator",
-					"NSError",
-					"NSException",
-					"NSExistsCommand",
-					"NSExpression",
-					"NSFileHandle",
-					"NSFileManager",
-					"NSFormatter",
-					"NSGarbageCollector",
-					"NSGetCommand",
-					"NSHashTable",
-					"NSHost",
-					"NSHTTPCookie",
-					"NSHTTPCookieStorage",
-					"NSHTTPURLResponse",
-					"NSIndexPath",
-					"NSIndexSet",
-					"NSIndexSpecifier",
-					"NSInputStream",
-					"NSInvocation",
-					"NSInvocationOperation",
-					"NSKeyedArchiver",
-					"NSKeyedUnarchiver",
-					"NSLocale",
-					"NSLock",
-					"NSLogicalTest",
-					"NSMachBootstrapServer",
-					"NSMachPort",
-					"NSMapTable",
-					"NSMessagePort",
-					"NSMessagePortNameServer",
-					"NSMetadataItem",
-					"NSMetadataQuery",
-					"NSMetadataQueryAttributeValueTuple",
-					"NSMetadataQueryResultGroup",
-					"NSMethodSignature",
-					"NSMiddleSpecifier",
-					"NSMoveCommand",
-					"NSMutableArray",
-					"NSMutableAttributedString",
-					"NSMutableCharacterSet",
-					"NSMutableData",
-					"NSMutableDictionary",
-					"NSMutableIndexSet",
-					"NSMutableSet",
-					"NSMutableString",
-					"NSMutableURLRequest",
-					"NSNameSpecifier",
-					"NSNetService",
-					"NSNetServiceBrowser",
-					"NSNotification",
-					"NSNotificationCenter",
-					"NSNotificationQueue",
-					"NSNull",
-					"NSNumber",
-					"NSNumberFormatter",
-					"NSObject",
-					"NSOperation",
-					"NSOperationQueue",
-					"NSOrthography",
-					"NSOutputStream",
-					"NSPipe",
-					"NSPointerArray",
-					"NSPointerFunctions",
-					"NSPort",
-					"NSPortCoder",
-					"NSPortMessage",
-					"NSPortNameServer",
-					"NSPositionalSpecifier",
-					"NSPredicate",
-					"NSProcessInfo",
-					"NSPropertyListSerialization",
-					"NSPropertySpecifier",
-					"NSProtocolChecker",
-					"NSProxy",
-					"NSQuitCommand",
-					"NSRandomSpecifier",
-					"NSRangeSpecifier",
-					"NSRecursiveLock",
-					"NSRelativeSpecifier",
-					"NSRunLoop",
-					"NSScanner",
-					"NSScriptClassDescription",
-					"NSScriptCoercionHandler",
-					"NSScriptCommand",
-					"NSScriptCommandDescription",
-					"NSScriptExecutionContext",
-					"NSScriptObjectSpecifier",
-					"NSScriptSuiteRegistry",
-					"NSScriptWhoseTest",
-					"NSSerializer",
-					"NSSet",
-					"NSSetCommand",
-					"NSSocketPort",
-					"NSSocketPortNameServer",
-					"NSSortDescriptor",
-					"NSSpecifierTest",
-					"NSSpellServer",
-					"NSStream",
-					"NSString",
-					"NSTask",
-					"NSTextCheckingResult",
-					"NSThread",
-					"NSTimer",
-					"NSTimeZone",
-					"NSUnarchiver",
-					"NSUndoManager",
-					"NSUniqueIDSpecifier",
-					"NSURL",
-					"NSURLAuthenticationChallenge",
-					"NSURLCache",
-					"NSURLConnection",
-					"NSURLCredential",
-					"NSURLCredentialStorage",
-					"NSURLDownload",
-					"NSURLHandle",
-					"NSURLProtectionSpace",
-					"NSURLProtocol",
-					"NSURLRequest",
-					"NSURLResponse",
-					"NSUserDefaults",
-					"NSValue",
-					"NSValueTransformer",
-					"NSWhoseSpecifier",
-					"NSXMLDocument",
-					"NSXMLDTD",
-					"NSXMLDTDNode",
-					"NSXMLElement",
-					"NSXMLNode",
-					"NSXMLParser"]
-				documentedTargets.update(dict.fromkeys(macFoundationClasses, "http://developer.apple.com/mac/library/documentation/Cocoa/Reference/Foundation/Classes/{name}_Class/index"))
-				
-				macFoundationProtocols = [
-					"NSCoding",
-					"NSComparisonMethods",
-					"NSConnectionDelegate",
-					"NSCopying",
-					"NSDecimalNumberBehaviors",
-					"NSErrorRecoveryAttempting",
-					"NSFastEnumeration",
-					"NSKeyedArchiverDelegate",
-					"NSKeyedUnarchiverDelegate",
-					"NSKeyValueCoding",
-					"NSKeyValueObserving",
-					"NSLocking",
-					"NSMachPortDelegate",
-					"NSMetadataQueryDelegate",
-					"NSMutableCopying",
-					"NSNetServiceBrowserDelegate",
-					"NSNetServiceDelegate",
-					"NSObjCTypeSerializationCallBack",
-				#	"NSObject", # No way to tell if the class or protocol should be
-				#				linked, so assume the class
-					"NSPortDelegate",
-					"NSScriptingComparisonMethods",
-					"NSScriptKeyValueCoding",
-					"NSScriptObjectSpecifiers",
-					"NSSpellServerDelegate",
-					"NSStreamDelegate",
-					"NSURLAuthenticationChallengeSender",
-					"NSURLHandleClient",
-					"NSURLProtocolClient",
-					"NSXMLParserDelegate"]
-				documentedTargets.update(dict.fromkeys(macFoundationProtocols, "http://developer.apple.com/mac/library/documentation/Cocoa/Reference/Foundation/Protocols/{name}_Protocol/index"))
-				
-				if verbose:
-					print "Establishing links to AppKit"
-				macAppKitClasses = [
-					"NSActionCell",
-					"NSAlert",
-					"NSAnimation",
-					"NSAnimationContext",
-					"NSApplication",
-					"NSArrayController",
-					"NSATSTypesetter",
-					"NSBezierPath",
-					"NSBitmapImageRep",
-					"NSBox",
-					"NSBrowser",
-					"NSBrowserCell",
-					"NSButton",
-					"NSButtonCell",
-					"NSCachedImageRep",
-					"NSCell",
-					"NSCIImageRep",
-					"NSClipView",
-					"NSCollectionView",
-					"NSCollectionViewItem",
-					"NSColor",
-					"NSColorList",
-					"NSColorPanel",
-					"NSColorPicker",
-					"NSColorSpace",
-					"NSColorWell",
-					"NSComboBox",
-					"NSComboBoxCell",
-					"NSControl",
-					"NSController",
-					"NSCursor",
-					"NSCustomImageRep",
-					"NSDatePicker",
-					"NSDatePickerCell",
-					"NSDictionaryController",
-					"NSDockTile",
-					"NSDocument",
-					"NSDocumentController",
-					"NSDrawer",
-					"NSEPSImageRep",
-					"NSEvent",
-					"NSFileWrapper",
-					"NSFont",
-					"NSFontDescriptor",
-					"NSFontManager",
-					"NSFontPanel",
-					"NSForm",
-					"NSFormCell",
-					"NSGlyphGenerator",
-					"NSGlyphInfo",
-					"NSGradient",
-					"NSGraphicsContext",
-					"NSHelpManager",
-					"NSImage",
-					"NSImageCell",
-					"NSImageRep",
-					"NSImageView",
-					"NSLayoutManager",
-					"NSLevelIndicator",
-					"NSLevelIndicatorCell",
-					"NSMatrix",
-					"NSMenu",
-					"NSMenuItem",
-					"NSMenuItemCell",
-					"NSMenuView",
-					"NSMutableParagraphStyle",
-					"NSNib",
-					"NSNibConnector",
-					"NSNibControlConnector",
-					"NSNibOutletConnector",
-					"NSObjectController",
-					"NSOpenGLContext",
-					"NSOpenGLLayer",
-					"NSOpenGLPixelBuffer",
-					"NSOpenGLPixelFormat",
-					"NSOpenGLView",
-					"NSOpenPanel",
-					"NSOutlineView",
-					"NSPageLayout",
-					"NSPanel",
-					"NSParagraphStyle",
-					"NSPasteboard",
-					"NSPasteboardItem",
-					"NSPathCell",
-					"NSPathComponentCell",
-					"NSPathControl",
-					"NSPDFImageRep",
-					"NSPersistentDocument",
-					"NSPICTImageRep",
-					"NSPopUpButton",
-					"NSPopUpButtonCell",
-					"NSPredicateEditor",
-					"NSPredicateEditorRowTemplate",
-					"NSPrinter",
-					"NSPrintInfo",
-					"NSPrintOperation",
-					"NSPrintPanel",
-					"NSProgressIndicator",
-					"NSResponder",
-					"NSRuleEditor",
-					"NSRulerMarker",
-					"NSRulerView",
-					"NSRunningApplication",
-					"NSSavePanel",
-					"NSScreen",
-					"NSScroller",
-					"NSScrollView",
-					"NSSearchField",
-					"NSSearchFieldCell",
-					"NSSecureTextField",
-					"NSSecureTextFieldCell",
-					"NSSegmentedCell",
-					"NSSegmentedControl",
-					"NSShadow",
-					"NSSlider",
-					"NSSliderCell",
-					"NSSound",
-					"NSSpeechRecognizer",
-					"NSSpeechSynthesizer",
-					"NSSpellChecker",
-					"NSSplitView",
-					"NSStatusBar",
-					"NSStatusItem",
-					"NSStepper",
-					"NSStepperCell",
-					"NSTableColumn",
-					"NSTableHeaderCell",
-					"NSTableHeaderView",
-					"NSTableView",
-					"NSTabView",
-					"NSTabViewItem",
-					"NSText",
-					"NSTextAttachment",
-					"NSTextAttachmentCell",
-					"NSTextBlock",
-					"NSTextContainer",
-					"NSTextField",
-					"NSTextFieldCell",
-					"NSTextInputContext",
-					"NSTextList",
-					"NSTextStorage",
-					"NSTextTab",
-					"NSTextTable",
-					"NSTextTableBlock",
-					"NSTextView",
-					"NSTokenField",
-					"NSTokenFieldCell",
-					"NSToolbar",
-					"NSToolbarItem",
-					"NSToolbarItemGroup",
-					"NSTouch",
-					"NSTrackingArea",
-					"NSTreeController",
-					"NSTreeNode",
-					"NSTypesetter",
-					"NSUserDefaultsController",
-					"NSView",
-					"NSViewAnimation",
-					"NSViewController",
-					"NSWindow",
-					"NSWindowController",
-					"NSWorkspace"]
-				documentedTargets.update(dict.fromkeys(macAppKitClasses, "http://developer.apple.com/mac/library/documentation/Cocoa/Reference/ApplicationKit/Classes/{name}_Class/index"))
-				
-				macAppKitProtocols = [
-					"NSAccessibility",
-					"NSAlertDelegate",
-					"NSAnimatablePropertyContainer",
-					"NSAnimationDelegate",
-					"NSApplicationDelegate",
-					"NSBrowserDelegate",
-					"NSChangeSpelling",
-					"NSCollectionViewDelegate",
-					"NSColorPickingCustom",
-					"NSColorPickingDefault",
-					"NSComboBoxCellDataSource",
-					"NSComboBoxDataSource",
-					"NSComboBoxDelegate",
-					"NSControlTextEditingDelegate",
-					"NSDatePickerCellDelegate",
-					"NSDictionaryControllerKeyValuePair",
-					"NSDockTilePlugIn",
-					"NSDraggingDestination",
-					"NSDraggingInfo",
-					"NSDraggingSource",
-					"NSDrawerDelegate",
-					"NSEditor",
-					"NSEditorRegistration",
-					"NSFontPanelValidation",
-					"NSGlyphStorage",
-					"NSIgnoreMisspelledWords",
-					"NSImageDelegate",
-					"NSKeyValueBindingCreation",
-					"NSLayoutManagerDelegate",
-					"NSMatrixDelegate",
-					"NSMenuDelegate",
-					"NSMenuValidation",
-					"NSNibAwaking",
-					"NSOpenSavePanelDelegate",
-					"NSOutlineViewDataSource",
-					"NSOutlineViewDelegate",
-					"NSPasteboardItemDataProvider",
-					"NSPasteboardReading",
-					"NSPasteboardWriting",
-					"NSPathCellDelegate",
-					"NSPathControlDelegate",
-					"NSPlaceholders",
-					"NSPrintPanelAccessorizing",
-					"NSRuleEditorDelegate",
-					"NSServicesRequests",
-					"NSSoundDelegate",
-					"NSSpeechRecognizerDelegate",
-					"NSSpeechSynthesizerDelegate",
-					"NSSplitViewDelegate",
-					"NSTableViewDataSource",
-					"NSTableViewDelegate",
-					"NSTabViewDelegate",
-					"NSTextAttachmentCell",
-					"NSTextDelegate",
-					"NSTextFieldDelegate",
-					"NSTextInput",
-					"NSTextInputClient",
-					"NSTextViewDelegate",
-					"NSTokenFieldCellDelegate",
-					"NSTokenFieldDelegate",
-					"NSToolbarDelegate",
-					"NSToolbarItemValidation",
-					"NSToolTipOwner",
-					"NSUserInterfaceValidations",
-					"NSValidatedUserInterfaceItem",
-					"NSWindowDelegate",
-					"NSWindowScripting"]
-				documentedTargets.update(dict.fromkeys(macAppKitProtocols, "http://developer.apple.com/mac/library/documentation/Cocoa/Reference/ApplicationKit/Protocols/{name}_Protocol/index"))
-			
-				if verbose:
-					print "Establishing links to Address Book"
-				macAddressBookClasses = [
-					"ABAddressBook",
-					"ABGroup",
-					"ABMultiValue",
-					"ABMutableMultiValue",
-					"ABPeoplePickerView",
-					"ABPerson",
-					"ABRecord",
-					"ABSearchElement"]
-				documentedTargets.update(dict.fromkeys(macAddressBookClasses, "http://developer.apple.com/mac/library/documentation/UserExperience/Reference/AddressBook/Classes/{name}_Class/index"))
-				
-				macAddressBookProtocols = [
-					"ABActionDelegate",
-					"ABImageClient"]
-				documentedTargets.update(dict.fromkeys(macAddressBookProtocols, "http://developer.apple.com/mac/library/documentation/UserExperience/Reference/AddressBook/Protocols/{name}_Protocol/index"))
-			
-				if verbose:
-					print "Establishing links to Core Data"
-				macCoreDataClasses = [
-					"NSAttributeDescription",
-					"NSEntityDescription",
-					"NSFetchedPropertyDescription",
-					"NSFetchRequestExpression",
-					"NSManagedObject",
-					"NSManagedObjectContext",
-					"NSManagedObjectID",
-					"NSManagedObjectModel",
-					"NSPersistentStoreCoordinator",
-					"NSPropertyDescription",
-					"NSRelationshipDescription"]
-				documentedTargets.update(dict.fromkeys(macCoreDataClasses, "http://developer.apple.com/mac/library/documentation/Cocoa/Reference/CoreDataFramework/Classes/{name}_Class/index"))
-			
-				# For whatever reason, some Core Data classes aren't at the same location as the others
-				macOtherCoreDataClasses = [
-					"NSAtomicStore",
-					"NSAtomicStoreCacheNode",
-					"NSEntityMapping",
-					"NSEntityMigrationPolicy",
-					"NSExpressionDescription",
-					"NSFetchRequest",
-					"NSMappingModel",
-					"NSMigrationManager",
-					"NSPersistentStore",
-					"NSPropertyMapping"]
-				documentedTargets.update(dict.fromkeys(macOtherCoreDataClasses, "http://developer.apple.com/mac/library/documentation/Cocoa/Reference/{name}_Class/index"))
-			
-				if verbose:
-					print "Establishing links to Core Location"
-				macCoreLocationClasses = [
-					"CLLocation",
-					"CLLocationManager"]
-				documentedTargets.update(dict.fromkeys(macCoreLocationClasses, "http://developer.apple.com/mac/library/documentation/CoreLocation/Reference/{name}_Class/index"))
-			
-				macCoreLocationProtocols = [
-					"CLLocationManagerDelegate"]
-				documentedTargets.update(dict.fromkeys(macCoreLocationProtocols, "http://developer.apple.com/mac/library/documentation/CoreLocation/Reference/{name}_Protocol/index"))
-				
+			counters.countRead(len(contents))
+			writeOutputFile(os.path.join(outputDirectory, fileName), contents, compress)
+
+# linkAndConvert for an object of one of the projects of a multi-project
+# build. projectArguments holds linkAndConvert's arguments for each project,
+# and is sent to each worker only once.
+def linkAndConvertInProject(projectArguments, projectIndex, doxygenObject):
+	return linkAndConvert(*(projectArguments[projectIndex] + (doxygenObject,)))
+
+# Linking only depends on the index, so each object goes straight on
+# to HTML conversion without waiting for the others
+def linkAndConvert(symbolTable, htmlOutputDirectory, projectName, renderer, compress, cache, doxygenObject):
+	linkify(doxygenObject, symbolTable)
+	if htmlOutputDirectory:
+		convertToHTML(doxygenObject, htmlOutputDirectory, projectName, renderer, compress, cache)
+	
+	# Workers link a copy of the object, so send back what changed
+	return doxygenObject.links
+
+def convertToHTML(doxygenObject, outputDirectory, projectName, renderer="xslt", compress=False, cache=None):
+	global verbose
+	
+	if verbose:
+		print("Converting " + doxygenObject.name + ".html")
+	
+	outputPath = doxygenObject.outputPath(outputDirectory, ".html")
+	_mkdir(os.path.dirname(outputPath))
+	document = doxygenObject.loadDocument()
+	output = None
+	if cache is not None:
+		# The native renderer is part of the program, which every key includes
+		rendererHash = renderer
+		if renderer != "python":
+			rendererHash = stylesheetNamed("object2html.xslt").hash
+		documentHash = hashlib.sha1(etree.tostring(document.getroot(), encoding="UTF-8")).hexdigest()
+		cacheKey = cache.key("html", rendererHash, projectName, documentHash)
+		output = cache.get(cacheKey)
+	
+	if output is None:
+		if renderer == "python":
+			output = renderObjectHTML(document, projectName)
+		else:
+			output = stylesheetNamed("object2html.xslt").serialize(document, projectName=projectName)
+		if cache is not None:
+			cache.put(cacheKey, output)
+	writeOutputFile(outputPath, output, compress)
+
+# With pageSize set, the index is split into pages of at most pageSize
+# objects, so that no page grows with the project
+def convertIndexToHTML(filePath, outputDirectory, compress=False, pageSize=0):
+	# Create the index html file
+	_mkdir(outputDirectory)
+	indexDocument = etree.parse(filePath)
+	counters.countRead(os.path.getsize(filePath))
+	counters.parses += 1
+	pages = {"index.html": indexDocument}
+	if pageSize:
+		pages = splitIndex(indexDocument.getroot(), pageSize)
+	
+	stylesheet = stylesheetNamed("index2html.xslt")
+	for (fileName, document) in pages.items():
+		writeOutputFile(os.path.join(outputDirectory, fileName), stylesheet.serialize(document), compress)
+	
+	# Remove the pages of an index that has since shrunk, or is no longer split
+	for fileName in os.listdir(outputDirectory):
+		match = indexPagePattern.match(fileName)
+		if match and match.group(1) not in pages:
+			os.remove(os.path.join(outputDirectory, fileName))
+
+indexPagePattern = re.compile(r"(index-[0-9]+\.html)(\.gz|\.br)?$")
+
+# Split an index into pages of at most pageSize objects, in the index's
+# alphabetical order. index.html becomes a summary that lists each page by
+# the first and last names on it, and each page lists the others too.
+# A landing page is summarized by project instead, as each project's own
+# index is already split. Return the document of each page by file name.
+def splitIndex(indexElement, pageSize):
+	if indexElement.tag == "projects":
+		summaryElement = etree.Element("projects", dict(indexElement.attrib))
+		for projectElement in indexElement.findall("project"):
+			attributes = dict(projectElement.attrib)
+			attributes["objects"] = str(len(projectElement.findall("object")))
+			etree.SubElement(summaryElement, "project", attributes)
+		return {"index.html": etree.ElementTree(summaryElement)}
+	
+	objectElements = indexElement.findall("object")
+	chunks = [objectElements[start:start + pageSize] for start in range(0, len(objectElements), pageSize)]
+	fileNames = ["index-%d.html" % (number) for number in range(1, len(chunks) + 1)]
+	
+	def pageElement(currentFileName):
+		pageElement = etree.Element(indexElement.tag, dict(indexElement.attrib))
+		for (fileName, chunk) in zip(fileNames, chunks):
+			attributes = {
+				"href": fileName,
+				"first": chunk[0].findtext("name"),
+				"last": chunk[-1].findtext("name"),
+				"objects": str(len(chunk))
+			}
+			if fileName == currentFileName:
+				attributes["current"] = "yes"
+			etree.SubElement(pageElement, "page", attributes)
+		return pageElement
+	
+	pages = {"index.html": etree.ElementTree(pageElement(None))}
+	for (fileName, chunk) in zip(fileNames, chunks):
+		element = pageElement(fileName)
+		element.extend(chunk)
+		pages[fileName] = etree.ElementTree(element)
+	return pages
+
+# The search box on each page (js/search.js) looks names up in an index of
+# every object and member, split into shards by the first two characters
+# of each name, so that a browser only loads the shards a query needs
+def searchShardKey(name):
+	return re.sub("[^a-z0-9]", "_", name[:2].lower())
+
+# projects holds the path from outputDirectory to the html directory of
+# each project in the index, and its documented objects
+def writeSearchIndex(projects, outputDirectory, compress=False):
+	shards = {}
+	for (projectPath, doxygenObject) in ((projectPath, doxygenObject) for (projectPath, objects) in projects for doxygenObject in objects):
+		page = projectPath + directoryForKind[doxygenObject.kind] + "/" + doxygenObject.name + ".html"
+		shards.setdefault(searchShardKey(doxygenObject.name), []).append([doxygenObject.name, doxygenObject.kind, page])
+		for (memberName, memberKind) in doxygenObject.members:
+			if memberName:
+				shards.setdefault(searchShardKey(memberName), []).append([memberName, memberKind, page + "#" + memberName])
+	
+	# Each shard is a script that passes its symbols, sorted by name, to the page
+	searchDirectory = os.path.join(outputDirectory, "search")
+	_mkdir(searchDirectory)
+	outputs = [("shards.js", "setSearchShards(%s);\n" % json.dumps(sorted(shards)))]
+	for (key, symbols) in shards.items():
+		symbols.sort(key=lambda symbol: (symbol[0].lower(), symbol[0], symbol[2]))
+		outputs.append((key + ".js", "addSearchShard(%s,%s);\n" % (json.dumps(key), json.dumps(symbols, separators=(",", ":")))))
+	
+	fileNames = set()
+	for (fileName, output) in outputs:
+		outputPath = os.path.join(searchDirectory, fileName)
+		writeOutputFile(outputPath, output.encode("utf-8"), compress)
+		fileNames.add(outputPath)
+		if compress:
+			fileNames.update(compressedPaths(outputPath))
+	
+	# Remove the shards of names that no longer exist
+	for fileName in os.listdir(searchDirectory):
+		if os.path.join(searchDirectory, fileName) not in fileNames:
+			os.remove(os.path.join(searchDirectory, fileName))
+
+# Yield the name, path and status of each Doxygen file in directory
+# os.scandir, which Python 2 lacks, can avoid a system call per file
+def inputFiles(directory):
+	if hasattr(os, "scandir"):
+		entries = ((entry.name, entry.path, entry.stat) for entry in os.scandir(directory))
+	else:
+		entries = ((fileName, os.path.join(directory, fileName), None) for fileName in os.listdir(directory))
+	
+	for (fileName, filePath, stat) in entries:
+		if fnmatch.fnmatch(fileName, "interface_*.xml") or fnmatch.fnmatch(fileName, "protocol_*.xml"):
+			if stat:
+				yield (fileName, filePath, stat())
 			else:
-				if verbose:
-					print "Establishing links to Foundation"
-				iphoneFoundationClasses = [
-					"NSArray",
-					"NSAssertionHandler",
-					"NSAutoreleasePool",
-					"NSBundle",
-					"NSCachedURLResponse",
-					"NSCalendar",
-					"NSCharacterSet",
-					"NSCoder",
-					"NSComparisonPredicate",
-					"NSCompoundPredicate",
-					"NSCondition",
-					"NSConditionLock",
-					"NSCountedSet",
-					"NSData",
-					"NSDate",
-					"NSDateComponents",
-					"NSDateFormatter",
-					"NSDecimalNumber",
-					"NSDecimalNumberHandler",
-					"NSDictionary",
-					"NSDirectoryEnumerator",
-					"NSDistributedNotificationCenter",
-					"NSEnumerator",
-					"NSError",
-					"NSException",
-					"NSExpression",
-					"NSFileHandle",
-					"NSFileManager",
-					"NSFormatter",
-					"NSHTTPCookie",
-					"NSHTTPCookieStorage",
-					"NSHTTPURLResponse",
-					"NSIndexPath",
-					"NSIndexSet",
-					"NSInputStream",
-					"NSInvocation",
-					"NSInvocationOperation",
-					"NSKeyedArchiver",
-					"NSKeyedUnarchiver",
-					"NSLocale",
-					"NSLock",
-					"NSMachPort",
-					"NSMessagePort",
-					"NSMethodSignature",
-					"NSMutableArray",
-					"NSMutableCharacterSet",
-					"NSMutableData",
-					"NSMutableDictionary",
-					"NSMutableIndexSet",
-					"NSMutableSet",
-					"NSMutableString",
-					"NSMutableURLRequest",
-					"NSNetService",
-					"NSNetServiceBrowser",
-					"NSNotification",
-					"NSNotificationCenter",
-					"NSNotificationQueue",
-					"NSNull",
-					"NSNumber",
-					"NSNumberFormatter",
-					"NSObject",
-					"NSOperation",
-					"NSOperationQueue",
-					"NSOutputStream",
-					"NSPipe",
-					"NSPort",
-					"NSPredicate",
-					"NSProcessInfo",
-					"NSPropertyListSerialization",
-					"NSProxy",
-					"NSRecursiveLock",
-					"NSRunLoop",
-					"NSScanner",
-					"NSSet",
-					"NSSortDescriptor",
-					"NSStream",
-					"NSString",
-					"NSThread",
-					"NSTimer",
-					"NSTimeZone",
-					"NSUndoManager",
-					"NSURL",
-					"NSURLAuthenticationChallenge",
-					"NSURLCache",
-					"NSURLConnection",
-					"NSURLCredential",
-					"NSURLCredentialStorage",
-					"NSURLProtectionSpace",
-					"NSURLProtocol",
-					"NSURLRequest",
-					"NSURLResponse",
-					"NSUserDefaults",
-					"NSValue",
-					"NSValueTransformer",
-					"NSXMLParser"]
-				documentedTargets.update(dict.fromkeys(iphoneFoundationClasses, "http://developer.apple.com/iphone/library/documentation/Cocoa/Reference/Foundation/Classes/{name}_Class/index"))
-			
-				iphoneFoundationProtocols = [
-					"NSCoding",
-					"NSCopying",
-					"NSDecimalNumberBehaviors",
-					"NSErrorRecoveryAttempting",
-					"NSFastEnumeration",
-					"NSKeyValueCoding",
-					"NSKeyValueObserving",
-					"NSLocking",
-					"NSMutableCopying",
-					"NSObject",
-					"NSURLAuthenticationChallengeSender",
-					"NSURLProtocolClient"]
-				documentedTargets.update(dict.fromkeys(iphoneFoundationProtocols, "http://developer.apple.com/iphone/library/documentation/Cocoa/Reference/Foundation/Protocols/{name}_Protocol/index"))
-			
-				if verbose:
-					print "Establishing links to AddressBook"
-				iphoneAddressBookClasses = [
-					"ABAddressBook",
-					"ABMultiValue",
-					"ABMutableMultiValue",
-					"ABRecord"]
-				documentedTargets.update(dict.fromkeys(iphoneAddressBookClasses, "http://developer.apple.com/iphone/library/documentation/AddressBook/Reference/{name}Ref_iPhoneOS/index"))
-					
-				if verbose:
-					print "Establishing links to AddressBookUI"
-				iphoneAddressBookUIClasses = [
-					"ABNewPersonViewController",
-					"ABPeoplePickerNavigationController",
-					"ABPersonViewController",
-					"ABUnknownPersonViewController"]
-				documentedTargets.update(dict.fromkeys(iphoneAddressBookUIClasses, "http://developer.apple.com/iphone/library/documentation/AddressBookUI/Reference/{name}_Class/index"))
-				
-				iphoneAddressBookUIProtocols = [
-					"ABNewPersonViewControllerDelegate",
-					"ABPeoplePickerNavigationControllerDelegate",
-					"ABPersonViewControllerDelegate",
-					"ABUnknownPersonViewControllerDelegate"]
-				documentedTargets.update(dict.fromkeys(iphoneAddressBookUIProtocols, "http://developer.apple.com/iphone/library/documentation/AddressBookUI/Reference/{name}_Protocol/index"))
+				yield (fileName, filePath, os.stat(filePath))
+
+# The modification time and size of each Doxygen file in directory
+def inputStats(directory):
+	return dict((fileName, [stat.st_mtime, stat.st_size]) for (fileName, filePath, stat) in inputFiles(directory))
+
+def hashFile(filePath):
+	f = open(filePath, "rb")
+	contents = f.read()
+	f.close()
+	counters.countRead(len(contents))
+	return hashlib.sha1(contents).hexdigest()
+
+# The directories each build writes to, inside the output directory
+outputNames = ("xml", "html")
+
+# What doxyclean writes inside those directories
+generatedOutputPattern = re.compile(r"(Classes|Categories|Protocols|css|js|search|index\.xml|index(-[0-9]+)?\.html(\.gz|\.br)?)$")
+
+# The xml and html directories of each output directory are replaced by
+# links into .doxyclean-builds when the first staged build is published.
+# Raise ValueError if an input directory is one of them, or is inside one,
+# or if one holds anything besides output written by earlier runs, since
+# replacing it would delete it.
+def checkOutputDirectories(inputDirectories, outputDirectories):
+	for outputDirectory in outputDirectories:
+		for name in outputNames + (".doxyclean-builds",):
+			outputPath = os.path.realpath(os.path.join(outputDirectory, name))
+			for inputDirectory in inputDirectories:
+				inputPath = os.path.realpath(inputDirectory)
+				if inputPath == outputPath or inputPath.startswith(outputPath + os.sep):
+					raise ValueError("The input directory %s is inside %s, which the output replaces" % (inputDirectory, os.path.join(outputDirectory, name)))
+		
+		for name in outputNames:
+			outputPath = os.path.join(outputDirectory, name)
+			if os.path.islink(outputPath) or not os.path.lexists(outputPath):
+				continue
+			if not os.path.isdir(outputPath):
+				raise ValueError("%s is in the way of the output, and is not a directory" % (outputPath))
+			for fileName in os.listdir(outputPath):
+				if not generatedOutputPattern.match(fileName):
+					raise ValueError("%s holds files that weren't written by doxyclean, such as %s, so it can't be replaced" % (outputPath, fileName))
+
+# Each run writes a complete new build into a staging directory, inside
+# .doxyclean-builds, starting from hard links to the files of the current
+# build. The output directory's xml and html are links into the current
+# build, so publishing the new one takes a single rename, and readers of
+# the output never see a half written build.
+class OutputTree(object):
+	def __init__(self, outputDirectory):
+		self.outputDirectory = outputDirectory
+		self.buildsDirectory = os.path.join(outputDirectory, ".doxyclean-builds")
+		self.currentLink = os.path.join(self.buildsDirectory, "current")
+		self.stagingDirectory = None
+	
+	# The directory holding the published xml, html and manifest
+	def currentDirectory(self):
+		if os.path.islink(self.currentLink):
+			return self.currentLink
+		
+		# Output from before builds were staged
+		return self.outputDirectory
+	
+	def currentBuild(self):
+		if os.path.islink(self.currentLink):
+			return os.readlink(self.currentLink)
+		return None
+	
+	# Create the staging directory, starting from the current build's
+	# files if they can be reused, and return it
+	def stage(self, reuseCurrent):
+		_mkdir(self.buildsDirectory)
+		
+		# Remove anything left behind by interrupted runs. Anything from the
+		# last day may belong to another run into the same output directory
+		# that is still going, so it is left alone.
+		for fileName in os.listdir(self.buildsDirectory):
+			if fileName in ("current", self.currentBuild()):
+				continue
+			path = os.path.join(self.buildsDirectory, fileName)
+			try:
+				if os.lstat(path).st_mtime < time.time() - 24 * 60 * 60:
+					removePath(path)
+			except OSError:
+				# Another run removed it first
+				continue
+		
+		self.stagingDirectory = tempfile.mkdtemp(prefix="build-", dir=self.buildsDirectory)
+		
+		# mkdtemp only gives the owner access, but the output is for everyone
+		umask = os.umask(0)
+		os.umask(umask)
+		os.chmod(self.stagingDirectory, 0o777 & ~umask)
+		
+		if reuseCurrent:
+			for name in outputNames:
+				currentPath = os.path.join(self.currentDirectory(), name)
+				if os.path.isdir(currentPath):
+					linkTree(currentPath, os.path.join(self.stagingDirectory, name))
+		return self.stagingDirectory
+	
+	def publish(self):
+		previousBuild = self.currentBuild()
+		
+		# Switch the current link over to the new build. The new link is named
+		# after the build, so that runs publishing at once don't share it.
+		newLink = os.path.join(self.buildsDirectory, "current-" + os.path.basename(self.stagingDirectory))
+		if os.path.lexists(newLink):
+			os.remove(newLink)
+		os.symlink(os.path.basename(self.stagingDirectory), newLink)
+		os.rename(newLink, self.currentLink)
+		
+		# The xml and html links go through the current link,
+		# so they only need to be created once
+		for name in outputNames:
+			outputPath = os.path.join(self.outputDirectory, name)
+			if os.path.islink(outputPath) or not os.path.isdir(os.path.join(self.stagingDirectory, name)):
+				continue
 			
-				if verbose:
-					print "Establishing links to Core Data"
-				iphoneCoreDataClasses = [
-					"NSAttributeDescription",
-					"NSEntityDescription",
-					"NSFetchedPropertyDescription",
-					"NSFetchRequest",
-					"NSManagedObject",
-					"NSManagedObjectContext",
-					"NSManagedObjectID",
-					"NSManagedObjectModel",
-					"NSPersistentStoreCoordinator",
-					"NSPropertyDescription",
-					"NSRelationshipDescription"]
-				documentedTargets.update(dict.fromkeys(iphoneCoreDataClasses, "http://developer.apple.com/iphone/library/documentation/Cocoa/Reference/CoreDataFramework/Classes/{name}_Class/index"))
+			# Remove output from before builds were staged. Only what doxyclean
+			# writes is removed, so anything else makes rmdir fail, rather
+			# than being deleted.
+			if os.path.lexists(outputPath):
+				for fileName in os.listdir(outputPath):
+					if generatedOutputPattern.match(fileName):
+						removePath(os.path.join(outputPath, fileName))
+				os.rmdir(outputPath)
+			os.symlink(os.path.join(os.path.basename(self.buildsDirectory), "current", name), outputPath)
+		removeManifest(self.outputDirectory)
+		
+		if previousBuild:
+			removePath(os.path.join(self.buildsDirectory, previousBuild))
+		self.stagingDirectory = None
+
+# Recreate a directory tree with hard links to its files,
+# or copies where the file system doesn't support them
+def linkTree(sourceDirectory, destinationDirectory):
+	for (directoryPath, directoryNames, fileNames) in os.walk(sourceDirectory):
+		relativePath = os.path.relpath(directoryPath, sourceDirectory)
+		destinationPath = os.path.normpath(os.path.join(destinationDirectory, relativePath))
+		_mkdir(destinationPath)
+		for fileName in fileNames:
+			try:
+				os.link(os.path.join(directoryPath, fileName), os.path.join(destinationPath, fileName))
+			except OSError:
+				shutil.copy2(os.path.join(directoryPath, fileName), os.path.join(destinationPath, fileName))
+
+def removePath(path):
+	if os.path.isdir(path) and not os.path.islink(path):
+		shutil.rmtree(path)
+	elif os.path.lexists(path):
+		os.remove(path)
+
+def manifestPath(outputDirectory):
+	return os.path.join(outputDirectory, ".doxyclean-manifest")
+
+# Return the object records from the previous run, and its verdicts on
+# which input files are documented. The records can only be reused if
+# nothing else has changed, but the verdicts only depend on the program.
+def loadManifest(outputDirectory, settings):
+	try:
+		f = open(manifestPath(outputDirectory), "rb")
+		manifest = json.loads(f.read().decode("utf-8"))
+		f.close()
+		counters.countRead(os.path.getsize(manifestPath(outputDirectory)))
+		counters.parses += 1
+	except (IOError, ValueError):
+		return ({}, {})
+	
+	records = {}
+	verdicts = {}
+	if manifest.get("settings") == settings:
+		records = manifest["objects"]
+	if manifest.get("settings", {}).get("program") == settings["program"]:
+		verdicts = manifest.get("verdicts", {})
+	return (records, verdicts)
+
+# Return the object records and verdicts that a build's manifest holds
+# fileStats holds the modification time and size of each input file,
+# so that the next run can tell which ones it doesn't need to read again
+def manifestState(objects, fileStats):
+	records = {}
+	verdicts = {}
+	for doxygenObject in objects:
+		fileName = os.path.basename(doxygenObject.sourcePath)
+		records[fileName] = doxygenObject.record()
+		verdicts[fileName] = {
+			"sourceHash": doxygenObject.sourceHash,
+			"documented": doxygenObject.documented,
+			"stat": fileStats[fileName]
+		}
+	return (records, verdicts)
+
+def saveManifest(outputDirectory, settings, objects, fileStats):
+	(records, verdicts) = manifestState(objects, fileStats)
+	manifest = {
+		"settings": settings,
+		"objects": records,
+		"verdicts": verdicts
+	}
+	
+	f = openOutputFile(manifestPath(outputDirectory))
+	f.write(json.dumps(manifest, indent=1, sort_keys=True, separators=(",", ": ")).encode("utf-8"))
+	f.close()
+	counters.countWrite(os.path.getsize(manifestPath(outputDirectory)))
+
+def removeManifest(outputDirectory):
+	if os.path.exists(manifestPath(outputDirectory)):
+		os.remove(manifestPath(outputDirectory))
+
+# Check whether an object that was not re-cleaned still needs to be linked
+# because names it links to, or might now link to, have changed
+# addedMatcher finds the names that are new link targets
+def linksAreStale(doxygenObject, changedNames, addedMatcher):
+	for name in doxygenObject.links:
+		if name in changedNames:
+			return True
+	
+	if addedMatcher.trie:
+		f = open(doxygenObject.path, "rb")
+		contents = f.read()
+		f.close()
+		counters.countRead(len(contents))
+		# Search the text as it was before linking, since a new name can
+		# extend a name that is already linked
+		text = refTagPattern.sub("", contents.decode("utf-8"))
+		for match in addedMatcher.matches(text):
+			return True
+	
+	return False
+
+refTagPattern = re.compile(r"</?ref\b[^>]*>")
+
+# Converts Doxygen's XML output into cleaned XML and HTML documentation.
+# main() uses it for the command line, and other Python programs can use it
+# to build the documentation of many projects in one process:
+#
+#	pipeline = doxyclean.Pipeline(renderer="python", jobs=4)
+#	for (inputDirectory, outputDirectory, projectName) in projects:
+#		pipeline.build(inputDirectory, outputDirectory, projectName)
+#
+# The options are the same as the command line's. The framework symbol
+# tables are read once, when the pipeline is created, and the stylesheets
+# are compiled once per process, so later builds only do per-project work.
+# Creating a pipeline raises IOError or ValueError if a symbol table can't
+# be read.
+class Pipeline(object):
+	def __init__(self, makeHTML=True, shouldEstablishIPhoneLinks=False, symbolTables=None, renderer="xslt", compress=False, cacheDirectory=None, cacheSize=1024, jobs=1, verbose=False, profile=False, indexPageSize=0):
+		self.makeHTML = makeHTML
+		self.renderer = renderer
+		self.compress = compress
+		self.indexPageSize = indexPageSize
+		self.verbose = verbose
+		self.shouldProfile = profile
+		self.jobs = jobs
+		if jobs < 1:
+			self.jobs = multiprocessing.cpu_count()
+		
+		# The profile of the last build, if profile is set
+		self.report = None
+		
+		tablePaths = symbolTablePaths(shouldEstablishIPhoneLinks, symbolTables)
+		self.frameworkSymbols = frameworkSymbolTable(tablePaths)
+		
+		# Everything besides the input files and the project name that affects
+		# the output. If any of it changes, a previous build can't be reused.
+		self.settings = {
+			"makeHTML": makeHTML,
+			"renderer": renderer,
+			"compress": compress,
+			"shouldEstablishIPhoneLinks": shouldEstablishIPhoneLinks,
+			"program": hashFile(os.path.abspath(__file__))
+		}
+		for fileName in ("object.xslt", "object2html.xslt", "index2html.xslt"):
+			self.settings[fileName] = hashFile(stylesheetNamed(fileName).path)
+		self.settings["symbolTables"] = [[os.path.abspath(path), hashFile(path)] for path in tablePaths]
+		
+		self.cache = None
+		if cacheDirectory:
+			self.cache = TransformCache(cacheDirectory, cacheSize * 1024 * 1024, self.settings["program"])
+	
+	# Build the documentation for the Doxygen XML in inputDirectory into the
+	# xml and html directories of outputDirectory, and return its objects.
+	# Only what changed since the last build into outputDirectory is rebuilt,
+	# unless rebuild is set.
+	# Raises ValueError if the input or output directories can't be used,
+	# as checkOutputDirectories describes.
+	def build(self, inputDirectory, outputDirectory, projectName="Untitled", rebuild=False):
+		checkOutputDirectories([inputDirectory], [outputDirectory])
+		(objects, fileStats) = self.run(self._build, inputDirectory, outputDirectory, projectName, rebuild, None)
+		return objects
+	
+	# Build several projects at once, so that each links to the objects of
+	# the others. projects holds the input directory and name of each. Each
+	# project is built into the subdirectory of outputDirectory named after
+	# it, and a landing page for all of them, titled with name, goes in
+	# outputDirectory's own xml and html directories. The objects of every
+	# project are cleaned, and then linked, by the same worker processes.
+	# Return the objects of each project.
+	def buildProjects(self, projects, outputDirectory, name="Untitled", rebuild=False):
+		checkProjectNames([projectName for (inputDirectory, projectName) in projects])
+		checkOutputDirectories([inputDirectory for (inputDirectory, projectName) in projects], [outputDirectory] + [os.path.join(outputDirectory, projectName) for (inputDirectory, projectName) in projects])
+		return self.run(self._buildProjects, projects, outputDirectory, name, rebuild)
+	
+	# Build, and then rebuild whenever the input files change, checking for
+	# changes every interval seconds. The objects of each build are yielded
+	# after it is published, and watching stops when the caller stops
+	# iterating, or on KeyboardInterrupt.
+	# The objects of the last build, with their documents, stay in memory
+	# between builds, so only the changed objects, and those linking to names
+	# that changed, are read again. Changes to the stylesheets or symbol
+	# tables need a new pipeline.
+	def watch(self, inputDirectory, outputDirectory, projectName="Untitled", interval=0.25, rebuild=False):
+		checkOutputDirectories([inputDirectory], [outputDirectory])
+		(objects, fileStats) = self.run(self._build, inputDirectory, outputDirectory, projectName, rebuild, None)
+		yield objects
+		
+		print("Watching %s for changes. Press Control-C to stop" % (inputDirectory))
+		watchedStats = fileStats
+		while True:
+			time.sleep(interval)
+			currentStats = inputStats(inputDirectory)
+			if currentStats == watchedStats:
+				continue
 			
-				# For some reason, certain Core Data docs are at a different URL
-				iphoneOtherCoreDataClasses = [
-					"NSAtomicStore",
-					"NSAtomicStoreCacheNode",
-					"NSEntityMapping",
-					"NSEntityMigrationPolicy",
-					"NSExpressionDescription",
-					"NSFetchedResultsController",
-					"NSFetchRequestExpression",
-					"NSMappingModel",
-					"NSMigrationManager",
-					"NSPersistentStore",
-					"NSPropertyMapping"]
-				documentedTargets.update(dict.fromkeys(iphoneOtherCoreDataClasses, "http://developer.apple.com/iphone/library/documentation/Cocoa/Reference/{name}_Class/index"))
+			# Doxygen rewrites many files, so wait until they stop changing
+			while True:
+				watchedStats = currentStats
+				time.sleep(interval)
+				currentStats = inputStats(inputDirectory)
+				if currentStats == watchedStats:
+					break
 			
-				iphoneCoreDataProtocols = [
-					"NSFetchedResultsControllerDelegate",
-					"NSFetchedResultsSectionInfo"]
-				documentedTargets.update(dict.fromkeys(iphoneCoreDataProtocols, "http://developer.apple.com/iphone/library/documentation/CoreData/Reference/{name}_Protocol/index"))
-				
-				if verbose:
-					print "Establishing links to Core Location"
-				iphoneCoreLocationClasses = [
-					"CLHeading",
-					"CLLocation",
-					"CLLocationManager"]
-				documentedTargets.update(dict.fromkeys(iphoneCoreLocationClasses, "http://developer.apple.com/iphone/library/documentation/CoreLocation/Reference/{name}_Class/index"))
-					
-				iphoneCoreLocationProtocols = [
-					"CLLocationManagerDelegate"]
-				documentedTargets.update(dict.fromkeys(iphoneCoreLocationProtocols, "http://developer.apple.com/iphone/library/documentation/CoreLocation/Reference/{name}_Protocol/index"))
+			print("Rebuilding")
+			startTime = time.time()
+			try:
+				(objects, fileStats) = self.run(self._build, inputDirectory, outputDirectory, projectName, False, (objects, fileStats))
+			except Exception as e:
+				# Keep watching, since the next change may fix the input
+				print("Error: Could not rebuild: %s" % (e), file=sys.stderr)
 				
-				
-				if verbose:
-					print "Establishing links to GameKit"
-				iphoneGameKitClasses = [
-					"GKPeerPickerController",
-					"GKSession",
-					"GKVoiceChatService"]
-				documentedTargets.update(dict.fromkeys(iphoneGameKitClasses, "http://developer.apple.com/iphone/library/documentation/GameKit/Reference/{name}_Class/index"))
-				
-				iphoneGameKitProtocols = [
-					"GKPeerPickerControllerDelegate",
-					"GKSessionDelegate",
-					"GKVoiceChatClient"]
-				documentedTargets.update(dict.fromkeys(iphoneGameKitProtocols, "http://developer.apple.com/iphone/library/documentation/GameKit/Reference/{name}_Protocol/index"))
-				
-				if verbose:
-					print "Establishing links to MapKit"
-				iphoneMapKitClasses = [
-					"MKAnnotationView",
-					"MKMapView",
-					"MKPinAnnotationView",
-					"MKPlacemark",
-					"MKReverseGeocoder",
-					"MKUserLocation"]
-				documentedTargets.update(dict.fromkeys(iphoneMapKitClasses, "http://developer.apple.com/iphone/library/documentation/MapKit/Reference/{name}_Class/index"))
-				
-				iphoneMapKitProtocols = [
-					"MKAnnotation",
-					"MKMapViewDelegate",
-					"MKReverseGeocoderDelegate"]
-				documentedTargets.update(dict.fromkeys(iphoneMapKitProtocols, "http://developer.apple.com/iphone/library/documentation/MapKit/Reference/{name}_Protocol/index"))
-				
-				if verbose:
-					print "Establishing links to MessageUI"
-				iphoneMessageUIClasses = [
-					"MFMailComposeViewController"]
-				documentedTargets.update(dict.fromkeys(iphoneMessageUIClasses, "http://developer.apple.com/iphone/library/documentation/MessageUI/Reference/{name}_Class/index"))
-				
-				iphoneMessageUIProtocols = [
-					"MFMailComposeViewControllerDelegate"]
-				documentedTargets.update(dict.fromkeys(iphoneMessageUIProtocols, "http://developer.apple.com/iphone/library/documentation/MessageUI/Reference/{name}_Protocol/index"))
-				
-				if verbose:
-					print "Establishing links to StoreKit"
-				iphoneStoreKitClasses = [
-					"SKMutablePayment",
-					"SKPayment",
-					"SKPaymentQueue",
-					"SKPaymentTransaction"]
-				documentedTargets.update(dict.fromkeys(iphoneStoreKitClasses, "http://developer.apple.com/iphone/library/documentation/StoreKit/Reference/{name}_Class/index"))
-			
-				# For whatever reason, this one class gets to live somewhere else...
-				iphoneOtherStoreKitClasses = [
-					"SKProduct"]
-				documentedTargets.update(dict.fromkeys(iphoneOtherStoreKitClasses, "http://developer.apple.com/iphone/library/documentation/StoreKit/Reference/{name}_Reference/index"))
-			
-				iphoneStoreKitProtocols = [
-					"SKPaymentTransactionObserver"]
-				documentedTargets.update(dict.fromkeys(iphoneStoreKitProtocols, "http://developer.apple.com/iphone/library/documentation/StoreKit/Reference/{name}_Protocol/index"))
+				# Documents may have been linked without being saved
+				for doxygenObject in objects:
+					doxygenObject.document = None
+				continue
+			print("Rebuilt in %.3f seconds" % (time.time() - startTime))
+			yield objects
+	
+	# The rest of the script reads the verbose and profile globals,
+	# so they are set to this pipeline's for the length of each build
+	def run(self, function, *arguments):
+		global verbose, profile
+		previousVerbose = verbose
+		previousProfile = profile
+		verbose = self.verbose
+		profile = None
+		if self.shouldProfile:
+			profile = Profile()
+		try:
+			return function(*arguments)
+		finally:
+			verbose = previousVerbose
+			profile = previousProfile
+	
+	# labelledObjects holds the task label of each object
+	def finishReport(self, labelledObjects):
+		if profile is not None:
+			self.report = profile.report(dict((label, doxygenObject.name) for (label, doxygenObject) in labelledObjects), self.jobs)
+	
+	# previous is what an earlier build in this process returned, with the
+	# modification time and size of each input file. Without it, the previous
+	# build is found from the manifest in the output directory.
+	def _build(self, inputDirectory, outputDirectory, projectName, rebuild, previous):
+		projectBuild = ProjectBuild(self, inputDirectory, outputDirectory, projectName, dict(self.settings, projectName=projectName), rebuild, previous)
+		changedInputs = projectBuild.scan()
+		beginStage("clean")
+		projectBuild.index(runTasks(cleanXML, changedInputs, self.jobs, labels=[os.path.basename(arguments[0]) for arguments in changedInputs]))
+		
+		# Find the names whose link targets were added, removed or changed
+		symbolTable = linkSymbolTable(self.frameworkSymbols, projectBuild.documentedObjects)
+		previousSymbolTable = linkSymbolTable(self.frameworkSymbols, projectBuild.previousDocumentedObjects)
+		changedNames = changedTargets(previousSymbolTable, symbolTable, set(previousSymbolTable.targets) | set(symbolTable.targets))
+		printCollisions(symbolTable)
+		
+		# Establish inter-file links and convert to HTML
+		if verbose:
+			print("Establishing links and converting to HTML:")
+		beginStage("link")
+		staleObjects = projectBuild.findStaleObjects(changedNames, symbolTable)
+		links = runTasks(linkAndConvert, [(doxygenObject,) for doxygenObject in staleObjects], self.jobs, projectBuild.linkArguments(symbolTable), [os.path.basename(doxygenObject.sourcePath) for doxygenObject in staleObjects])
+		projectBuild.finish(links)
+		
+		beginStage("publish")
+		projectBuild.publish()
+		
+		self.trimCache()
+		self.finishReport((os.path.basename(doxygenObject.sourcePath), doxygenObject) for doxygenObject in projectBuild.objects)
+		return (projectBuild.objects, projectBuild.fileStats)
+	
+	def _buildProjects(self, projects, outputDirectory, name, rebuild):
+		projectNames = [projectName for (inputDirectory, projectName) in projects]
+		projectBuilds = []
+		for (inputDirectory, projectName) in projects:
+			# Adding or removing a project changes the links of the others
+			settings = dict(self.settings, projectName=projectName, projects=projectNames)
+			projectBuilds.append(ProjectBuild(self, inputDirectory, os.path.join(outputDirectory, projectName), projectName, settings, rebuild, None))
+		
+		# Linking needs the objects of every project, so clean all of them first
+		changedInputs = []
+		labels = []
+		for projectBuild in projectBuilds:
+			for arguments in projectBuild.scan():
+				changedInputs.append(arguments)
+				labels.append(projectBuild.projectName + "/" + os.path.basename(arguments[0]))
+		beginStage("clean")
+		cleanedObjects = runTasks(cleanXML, changedInputs, self.jobs, labels=labels)
+		for projectBuild in projectBuilds:
+			cleanedCount = len(projectBuild.changedInputs)
+			projectBuild.index(cleanedObjects[:cleanedCount])
+			cleanedObjects = cleanedObjects[cleanedCount:]
+		
+		# Find the names whose link targets were added, removed or changed,
+		# first in the table all projects share, and then in each project's view
+		symbolTable = projectsSymbolTable(self.frameworkSymbols, [(projectBuild.projectName, projectBuild.documentedObjects) for projectBuild in projectBuilds])
+		previousSymbolTable = projectsSymbolTable(self.frameworkSymbols, [(projectBuild.projectName, projectBuild.previousDocumentedObjects) for projectBuild in projectBuilds])
+		sharedChangedNames = changedTargets(previousSymbolTable, symbolTable, set(previousSymbolTable.targets) | set(symbolTable.targets))
+		printCollisions(symbolTable)
+		
+		if verbose:
+			print("Establishing links and converting to HTML:")
+		beginStage("link")
+		projectArguments = []
+		tasks = []
+		labels = []
+		for (projectIndex, projectBuild) in enumerate(projectBuilds):
+			projectSymbols = ProjectSymbolTable(symbolTable, projectBuild.documentedObjects)
+			previousProjectSymbols = ProjectSymbolTable(previousSymbolTable, projectBuild.previousDocumentedObjects)
+			changedNames = changedTargets(previousProjectSymbols, projectSymbols, sharedChangedNames | set(projectSymbols.localSymbols.targets) | set(previousProjectSymbols.localSymbols.targets))
+			printCollisions(projectSymbols)
 			
-				# REALLY?!?
-				iphoneWeirdStoreKitClassesAndProtocols = [
-					"SKProductsRequest",
-					"SKProductsResponse",
-					"SKRequest",
-					"SKProductsRequestDelegate",
-					"SKRequestDelegate"]
-				documentedTargets.update(dict.fromkeys(iphoneWeirdStoreKitClassesAndProtocols, "http://developer.apple.com/iphone/library/documentation/StoreKit/Reference/{name}/index"))
-				
-				if verbose:
-					print "Establishing links to UIKit"
-				iphoneUIKitClasses = [
-					"UIAcceleration",
-					"UIAccelerometer",
-					"UIAccessibilityElement",
-					"UIActionSheet",
-					"UIActivityIndicatorView",
-					"UIAlertView",
-					"UIApplication",
-					"UIBarButtonItem",
-					"UIBarItem",
-					"UIButton",
-					"UIColor",
-					"UIControl",
-					"UIDatePicker",
-					"UIDevice",
-					"UIEvent",
-					"UIFont",
-					"UIImage",
-					"UIImagePickerController",
-					"UIImageView",
-					"UILabel",
-					"UILocalizedIndexedCollation",
-					"UIMenuController",
-					"UINavigationBar",
-					"UINavigationController",
-					"UINavigationItem",
-					"UIPageControl",
-					"UIPasteboard",
-					"UIPickerView",
-					"UIProgressView",
-					"UIResponder",
-					"UIScreen",
-					"UIScrollView",
-					"UISearchBar",
-					"UISearchDisplayController",
-					"UISegmentedControl",
-					"UISlider",
-					"UISwitch",
-					"UITabBar",
-					"UITabBarController",
-					"UITabBarItem",
-					"UITableView",
-					"UITableViewCell",
-					"UITableViewController",
-					"UITextField",
-					"UITextView",
-					"UIToolbar",
-					"UITouch",
-					"UIVideoEditorController",
-					"UIView",
-					"UIViewController",
-					"UIWebView",
-					"UIWindow"]
-				documentedTargets.update(dict.fromkeys(iphoneUIKitClasses, "http://developer.apple.com/iphone/library/documentation/UIKit/Reference/{name}_Class/index"))
-				
-				iphoneUIKitProtocols = [
-					"UIAccelerometerDelegate",
-					"UIAccessibility",
-					"UIAccessibilityContainer",
-					"UIActionSheetDelegate",
-					"UIAlertViewDelegate",
-					"UIApplicationDelegate",
-					"UIImagePickerControllerDelegate",
-					"UINavigationBarDelegate",
-					"UINavigationControllerDelegate",
-					"UIPickerViewDataSource",
-					"UIPickerViewDelegate",
-					"UIResponderStandardEditActions",
-					"UIScrollViewDelegate",
-					"UISearchBarDelegate",
-					"UISearchDisplayDelegate",
-					"UITabBarControllerDelegate",
-					"UITabBarDelegate",
-					"UITableViewDataSource",
-					"UITableViewDelegate",
-					"UITextFieldDelegate",
-					"UITextInputTraits",
-					"UITextViewDelegate",
-					"UIVideoEditorControllerDelegate",
-					"UIWebViewDelegate"]
-				documentedTargets.update(dict.fromkeys(iphoneUIKitProtocols, "http://developer.apple.com/iphone/library/documentation/UIKit/Reference/{name}_Protocol/index"))
+			projectArguments.append(projectBuild.linkArguments(projectSymbols))
+			for doxygenObject in projectBuild.findStaleObjects(changedNames, projectSymbols):
+				tasks.append((projectIndex, doxygenObject))
+				labels.append(projectBuild.projectName + "/" + os.path.basename(doxygenObject.sourcePath))
+		links = runTasks(linkAndConvertInProject, tasks, self.jobs, (projectArguments,), labels)
+		for (projectIndex, projectBuild) in enumerate(projectBuilds):
+			projectBuild.finish([objectLinks for ((taskIndex, doxygenObject), objectLinks) in zip(tasks, links) if taskIndex == projectIndex])
+		
+		# The landing page is a build of its own, with the index and search
+		# index of every project. Every build is staged before any is
+		# published, so they are published one right after another.
+		if verbose:
+			print("Creating the landing page")
+		beginStage("landing")
+		outputTree = OutputTree(outputDirectory)
+		stagingDirectory = outputTree.stage(False)
+		indexPath = createProjectsIndexXML([(projectBuild.projectName, "../" + projectBuild.projectName + "/html/", projectBuild.documentedObjects) for projectBuild in projectBuilds], os.path.join(stagingDirectory, "xml"), name)
+		if self.makeHTML:
+			htmlOutputDirectory = os.path.join(stagingDirectory, "html")
+			convertIndexToHTML(indexPath, htmlOutputDirectory, self.compress, self.indexPageSize)
+			writeSearchIndex([("../" + projectBuild.projectName + "/html/", projectBuild.documentedObjects) for projectBuild in projectBuilds], htmlOutputDirectory, self.compress)
+			copyAssets(htmlOutputDirectory, self.compress)
+		
+		beginStage("publish")
+		for projectBuild in projectBuilds:
+			projectBuild.publish()
+		outputTree.publish()
+		
+		self.trimCache()
+		self.finishReport((projectBuild.projectName + "/" + os.path.basename(doxygenObject.sourcePath), doxygenObject) for projectBuild in projectBuilds for doxygenObject in projectBuild.objects)
+		return [projectBuild.objects for projectBuild in projectBuilds]
+	
+	def trimCache(self):
+		if self.cache is not None:
+			beginStage("cache")
+			self.cache.trim()
+
+# One project's build, from finding the inputs that changed since the last
+# build to publishing the new one. Pipeline runs the steps of the builds of
+# several projects side by side, so that their objects are cleaned and
+# linked by the same worker processes.
+class ProjectBuild(object):
+	def __init__(self, pipeline, inputDirectory, outputDirectory, projectName, settings, rebuild, previous):
+		self.pipeline = pipeline
+		self.inputDirectory = inputDirectory
+		self.outputDirectory = outputDirectory
+		self.projectName = projectName
+		self.settings = settings
+		self.rebuild = rebuild
+		self.previous = previous
+	
+	# Stage the build, and return the arguments to cleanXML for each of the
+	# input files that changed since the last one
+	def scan(self):
+		_mkdir(self.outputDirectory)
+		
+		# Find out what was built last time
+		beginStage("scan")
+		self.outputTree = OutputTree(self.outputDirectory)
+		previousRecords = {}
+		verdicts = {}
+		previousDocuments = {}
+		if self.previous is not None:
+			(previousRecords, verdicts) = manifestState(*self.previous)
+			previousDocuments = dict((os.path.basename(doxygenObject.sourcePath), doxygenObject.document) for doxygenObject in self.previous[0])
+		elif not self.rebuild:
+			(previousRecords, verdicts) = loadManifest(self.outputTree.currentDirectory(), self.settings)
+		
+		# Build into a staging directory, which is only published once
+		# everything is done. Its manifest is written last.
+		beginStage("stage")
+		self.stagingDirectory = self.outputTree.stage(bool(previousRecords))
+		
+		# Set the output directories
+		self.xmlOutputDirectory = os.path.join(self.stagingDirectory, "xml")
+		self.htmlOutputDirectory = None
+		if self.pipeline.makeHTML:
+			self.htmlOutputDirectory = os.path.join(self.stagingDirectory, "html")
+		
+		previousObjects = [DoxygenObject.fromRecord(None, record, self.xmlOutputDirectory) for record in previousRecords.values()]
+		self.previousDocumentedObjects = [doxygenObject for doxygenObject in previousObjects if doxygenObject.documented]
 			
+		# Clean up the XML files that changed since the last run
+		if verbose:
+			print("Cleaning XML files:")
+		beginStage("inputs")
+		
+		self.objects = []
+		self.changedInputs = []
+		self.fileStats = {}
+		for (fileName, filePath, stat) in inputFiles(self.inputDirectory):
+			# Files that haven't been touched since the last run keep their hash.
+			# Files that weren't seen before are hashed by cleanXML as it reads
+			# them, since there is nothing to compare their hash with.
+			self.fileStats[fileName] = [stat.st_mtime, stat.st_size]
+			verdict = verdicts.get(fileName)
+			record = previousRecords.get(fileName)
+			sourceHash = None
+			if verdict and verdict["stat"] == self.fileStats[fileName]:
+				sourceHash = verdict["sourceHash"]
+			elif verdict or record:
+				sourceHash = hashFile(filePath)
 			
-			# Establish links to all files in the project
-			for documentedObject in documentedObjects:
-				# We need to get rid of whitespace
-				# (It's a "feature" of minidom)
-				objectName = documentedObject.firstChild.data.replace("\n", "").replace("\t", "")
-				objectType = documentedObject.parentNode.attributes["kind"].value
-				
-				if objectType == "class":
-					target = "../Classes/{name}"
-				elif objectType == "category":
-					target = "../Categories/{name}"
-				elif objectType == "protocol":
-					target = "../Protocols/{name}"
-					
-				documentedTargets[objectName] = target
+			# Files already known to be undocumented don't need to be read at all
+			if verdict and verdict["sourceHash"] == sourceHash and not verdict["documented"]:
+				self.objects.append(DoxygenObject(filePath, sourceHash, False))
+				continue
 			
-			documentedTargetNames = documentedTargets.keys()
-			documentedTargetNames.sort(cmp=longestToShortestCompare)
-			documentedTargetsPattern = "([^\\<\\>]*)(" + '|'.join(documentedTargetNames) + ")"
-			fileContents = re.sub(documentedTargetsPattern, "\\1<ref>\\2</ref>", fileContents)
-				
-			fileDOM = minidom.parseString(fileContents)
-			refNodes = fileDOM.getElementsByTagName("ref")
-			for refNode in refNodes:
-				# If it's within the top-level <name> or <file> elements,
-				# remove the <ref>
-				# This is no longer checked in the regex since <name> or <file>
-				# could feasibly be used in other contexts (ie: inheritance lists)
-				if ((refNode.parentNode.tagName == "name") or (refNode.parentNode.tagName == "file")) and (refNode.parentNode.parentNode.tagName == "object"):
-					textNode = fileDOM.createTextNode(refNode.childNodes[0].nodeValue)
-					refNode.parentNode.replaceChild(textNode, refNode)
+			if record and record["sourceHash"] == sourceHash:
+				doxygenObject = DoxygenObject.fromRecord(filePath, record, self.xmlOutputDirectory)
+				doxygenObject.document = previousDocuments.get(fileName)
+				if not doxygenObject.documented or (os.path.exists(doxygenObject.path) and (not self.htmlOutputDirectory or os.path.exists(doxygenObject.outputPath(self.htmlOutputDirectory, ".html")))):
+					self.objects.append(doxygenObject)
 					continue
-				
-				refName = refNode.childNodes[0].nodeValue
-				formatString = documentedTargets[refName]
-				refTarget = formatString.format(name=refName)
-				refNode.setAttribute("id", refTarget)
-	
-			# Write the xml file
-			f = open(filePath, "w")			
-			f.write(fileDOM.toxml("UTF-8"))
-			f.close()
-			
-def convertToHTML(filePath, outputDirectory):
-	global verbose
+			self.changedInputs.append((filePath, self.xmlOutputDirectory, self.pipeline.cache))
+		return self.changedInputs
 	
-	# Get info about the object
-	objectName = nameForFile(filePath)
-	objectType = typeForFile(filePath)
+	# Add the objects cleaned from the changed inputs, and create the index
+	def index(self, cleanedObjects):
+		self.cleanedObjects = set(cleanedObjects)
+		self.objects.extend(cleanedObjects)
+		self.documentedObjects = [doxygenObject for doxygenObject in self.objects if doxygenObject.documented]
+		
+		# Remove the output of objects that were deleted or renamed
+		currentPaths = set(doxygenObject.path for doxygenObject in self.documentedObjects)
+		for doxygenObject in self.previousDocumentedObjects:
+			if doxygenObject.path not in currentPaths:
+				outputPaths = [doxygenObject.path]
+				if self.htmlOutputDirectory:
+					htmlPath = doxygenObject.outputPath(self.htmlOutputDirectory, ".html")
+					outputPaths.append(htmlPath)
+					outputPaths.extend(compressedPaths(htmlPath))
+				for outputPath in outputPaths:
+					if os.path.exists(outputPath):
+						os.remove(outputPath)
+
+		# Create the index file
+		# Linking needs the whole index, so every object must be cleaned first
+		if verbose:
+			print("Creating index.xml")
+		beginStage("index")
+		self.indexPath = createIndexXML(self.documentedObjects, self.xmlOutputDirectory, self.projectName)
 	
-	if verbose:
-		print "Converting " + objectName + ".html"
-	
-	if objectType == "class":
-		outputDirectory = os.path.join(outputDirectory, "Classes")
-	elif objectType == "category":
-		outputDirectory = os.path.join(outputDirectory, "Categories")
-	elif objectType == "protocol":
-		outputDirectory = os.path.join(outputDirectory, "Protocols")
-	_mkdir(outputDirectory)
+	# Return the objects that need to be linked and converted to HTML:
+	# those that were re-cleaned, and those whose links changed
+	def findStaleObjects(self, changedNames, symbolTable):
+		addedMatcher = SymbolMatcher(name for name in changedNames if symbolTable.target(name) is not None)
+		self.staleObjects = [doxygenObject for doxygenObject in self.documentedObjects if doxygenObject in self.cleanedObjects or linksAreStale(doxygenObject, changedNames, addedMatcher)]
+		return self.staleObjects
 	
-	outputPath = os.path.join(outputDirectory, objectName + ".html")
+	# The arguments to linkAndConvert shared by each of the stale objects
+	def linkArguments(self, symbolTable):
+		return (symbolTable, self.htmlOutputDirectory, self.projectName, self.pipeline.renderer, self.pipeline.compress, self.pipeline.cache)
 	
-	stylesheetPath = sys.path[0] + '/object2html.xslt'
-	os.system("xsltproc -o \"%s\" \"%s\" \"%s\"" % (outputPath, stylesheetPath, filePath))
-
-def convertIndexToHTML(filePath, outputDirectory):
-	# Create the index html file
-	stylesheetPath = sys.path[0] + '/index2html.xslt'
-	outputPath = outputDirectory + '/index.html'
-	os.system("xsltproc -o \"%s\" \"%s\" \"%s\"" % (outputPath, stylesheetPath, filePath))
-
-def insertProjectName(directory, projectName):
-	for (path, dirs, files) in os.walk(directory):
-		for fileName in files:
-			filePath = os.path.join(path, fileName)
+	# Write the rest of the build, given the links of each stale object
+	def finish(self, links):
+		for (doxygenObject, objectLinks) in zip(self.staleObjects, links):
+			doxygenObject.links = objectLinks
+		
+		compress = self.pipeline.compress
+		if self.htmlOutputDirectory:
+			if verbose:
+				print("Converting index.html")
+			beginStage("index-html")
+			convertIndexToHTML(self.indexPath, self.htmlOutputDirectory, compress, self.pipeline.indexPageSize)
 			
-			# Replace Project with projectName
-			f = open(filePath, "r")
-			text = f.read()
-			f.close()
-			f = open(filePath, "w")
-			f.write(text.replace("##PROJECT##", projectName))
+			if verbose:
+				print("Writing the search index")
+			beginStage("search")
+			writeSearchIndex([("", self.documentedObjects)], self.htmlOutputDirectory, compress)
+			
+			if verbose:
+				print("Copying CSS stylesheets and scripts")
+			# Copy the CSS and JavaScript files over to the new path
+			beginStage("assets")
+			copyAssets(self.htmlOutputDirectory, compress)
+		
+		beginStage("manifest")
+		saveManifest(self.stagingDirectory, self.settings, self.objects, self.fileStats)
+	
+	def publish(self):
+		self.outputTree.publish()
+
+# Project names are the names of directories in the output directory,
+# beside the landing page's own
+def checkProjectNames(projectNames):
+	for projectName in projectNames:
+		if not projectName or projectName.startswith(".") or projectName in outputNames or "/" in projectName or os.sep in projectName:
+			raise ValueError("Not a usable project name: %s" % (projectName))
+		if projectNames.count(projectName) > 1:
+			raise ValueError("More than one project is named %s" % (projectName))
+
+def printCollisions(symbolTable):
+	if verbose:
+		for (name, origin, hiddenOrigin) in symbolTable.collisions:
+			print("Linking %s to %s, rather than %s" % (name, origin, hiddenOrigin))
+
+def writeReport(options, report):
+	if report is not None:
+		if options.profile:
+			printReport(report)
+		if options.statsPath:
+			f = open(options.statsPath, "wb")
+			f.write(json.dumps(report, indent=1, sort_keys=True, separators=(",", ": ")).encode("utf-8"))
 			f.close()
 
 def main(argv=None):
 	if argv is None:
 		argv = sys.argv
 		
-	global verbose
-		
 	# Parse command line options
 	optionParser = OptionParser(version="%prog 2.2")
 	optionParser.add_option("-i", "--input", type="string", dest="inputDirectory", default=os.getcwd(), help="The directory containing Doxygen's XML output. Default is the current directory")
 	optionParser.add_option("-o", "--output", type="string", dest="outputDirectory", default=os.getcwd(), help="The directory to output the converted files to. Default is the current directory")
-	optionParser.add_option("-n", "--name", type="string", dest="projectName", default="Untitled", help="The name of the project")
+	optionParser.add_option("-n", "--name", type="string", dest="projectName", default="Untitled", help="The name of the project, or with --project, of the landing page")
+	optionParser.add_option("--project", action="append", type="string", dest="projects", metavar="NAME=PATH", help="Build the project named NAME from Doxygen's XML output in PATH, into the subdirectory of the output directory named NAME. May be given more than once, in place of --input, to build several projects that link to each other, with a landing page for all of them in the output directory")
 	optionParser.add_option("-x", "--xml", action="store_false", dest="makeHTML", default=True, help="Only generate XML. If this flag is not set, both XML and HTML will be generated")
 	optionParser.add_option("-p", "--phone", action="store_true", dest="shouldEstablishIPhoneLinks", default=False, help="Establish links to Apple's iPhone framework documentation, rather than to Mac frameworks")
+	optionParser.add_option("-s", "--symbols", action="append", type="string", dest="symbolTables", metavar="PATH", help="A framework symbol table, or a directory of them, to link against in addition to the built-in ones. May be given more than once")
+	optionParser.add_option("--renderer", type="choice", choices=["xslt", "python"], dest="renderer", default="xslt", help="How to produce each object's HTML page: xslt applies object2html.xslt, python uses the built-in renderer, which produces the same markup without a stylesheet. Default is xslt")
+	optionParser.add_option("--compress", action="store_true", dest="compress", default=False, help="Minify the HTML and CSS output, and write gzip and brotli compressed copies of each file beside it, for serving from a static file server")
+	optionParser.add_option("--index-page-size", type="int", dest="indexPageSize", metavar="N", default=0, help="Split the index into pages of at most N objects each, in alphabetical order, with index.html listing the pages. With --project, the landing page lists the projects instead. Default is 0, which lists every object on index.html")
+	optionParser.add_option("--cache", type="string", dest="cacheDirectory", metavar="PATH", help="A directory to keep cleaned XML and rendered HTML in, so later runs, including runs of other checkouts or on other machines sharing the directory, can reuse them")
+	optionParser.add_option("--cache-size", type="int", dest="cacheSize", metavar="MB", default=1024, help="The size the cache is trimmed to after each run, in megabytes. Default is 1024")
+	optionParser.add_option("-j", "--jobs", type="int", dest="jobs", default=1, help="The number of worker processes to use. Use 0 for one per CPU. Default is 1")
+	optionParser.add_option("-w", "--watch", action="store_true", dest="watch", default=False, help="Keep running after the build, and rebuild whenever the input files change. Changes to stylesheets and symbol tables need a restart")
+	optionParser.add_option("--watch-interval", type="float", dest="watchInterval", metavar="SECONDS", default=0.25, help="How often to check the input files for changes with --watch. Default is 0.25")
+	optionParser.add_option("-r", "--rebuild", action="store_true", dest="rebuild", default=False, help="Rebuild everything, rather than only the objects that changed since the last run")
+	optionParser.add_option("--profile", action="store_true", dest="profile", default=False, help="Print the time and work taken by each stage, and the slowest objects")
+	optionParser.add_option("--stats-json", type="string", dest="statsPath", metavar="PATH", help="Write the time and work taken by each stage and each object to a JSON file")
 	optionParser.add_option("-v", "--verbose", action="store_true", dest="verbose", default=False, help="Show detailed information")
 	(options, args) = optionParser.parse_args(argv[1:])
 
-	verbose = options.verbose
-
-	if verbose:
-		print "Checking arguments"
+	if options.verbose:
+		print("Checking arguments")
 		
 	# Check the arguments
-	if not os.path.exists(options.inputDirectory):
-		print >>sys.stderr, "Error: Input path does not exist: %s" % (options.inputDirectory)
-		optionParser.print_help()
-		return errno.ENOENT
-	elif not os.path.isdir(options.inputDirectory):
-		print >>sys.stderr, "Error: Input path is not a directory: %s" % (options.inputDirectory)
-		optionParser.print_help()
-		return errno.ENOTDIR
+	projects = []
+	for project in options.projects or []:
+		(projectName, separator, inputDirectory) = project.partition("=")
+		if not separator:
+			print("Error: Projects must be given as NAME=PATH: %s" % (project), file=sys.stderr)
+			return errno.EINVAL
+		projects.append((inputDirectory, projectName))
+	try:
+		checkProjectNames([projectName for (inputDirectory, projectName) in projects])
+	except ValueError as e:
+		print("Error: %s" % (e), file=sys.stderr)
+		return errno.EINVAL
+	if projects and options.watch:
+		print("Error: Only a single project can be watched", file=sys.stderr)
+		return errno.EINVAL
+	
+	for inputDirectory in [inputDirectory for (inputDirectory, projectName) in projects] or [options.inputDirectory]:
+		if not os.path.exists(inputDirectory):
+			print("Error: Input path does not exist: %s" % (inputDirectory), file=sys.stderr)
+			optionParser.print_help()
+			return errno.ENOENT
+		elif not os.path.isdir(inputDirectory):
+			print("Error: Input path is not a directory: %s" % (inputDirectory), file=sys.stderr)
+			optionParser.print_help()
+			return errno.ENOTDIR
 	if os.path.exists(options.outputDirectory) and not os.path.isdir(options.outputDirectory):
-		print >>sys.stderr, "Error: Output path is not a directory: %s" % (options.outputDirectory)
+		print("Error: Output path is not a directory: %s" % (options.outputDirectory), file=sys.stderr)
 		return errno.ENOTDIR
-	else:
-		_mkdir(options.outputDirectory)
-		
-	# Set the xml output directory
-	xmlOutputDirectory = os.path.join(options.outputDirectory, "xml")
-		
-	# Clean up the XML files
-	if verbose:
-		print "Cleaning XML files:"
 	
-	for fileName in os.listdir(options.inputDirectory):
-		if fnmatch.fnmatch(fileName, "interface_*.xml") or fnmatch.fnmatch(fileName, "protocol_*.xml"):
-			filePath = os.path.join(options.inputDirectory, fileName)
-			cleanXML(filePath, xmlOutputDirectory)
-
-	# Create the index file
-	if verbose:
-		print "Creating index.xml"
-	indexPath = createIndexXML(xmlOutputDirectory)
+	try:
+		if projects:
+			checkOutputDirectories([inputDirectory for (inputDirectory, projectName) in projects], [options.outputDirectory] + [os.path.join(options.outputDirectory, projectName) for (inputDirectory, projectName) in projects])
+		else:
+			checkOutputDirectories([options.inputDirectory], [options.outputDirectory])
+	except ValueError as e:
+		print("Error: %s" % (e), file=sys.stderr)
+		return errno.EINVAL
 	
-	# Establish inter-file links
-	if verbose:
-		print "Establishing links:"
-	linkify(xmlOutputDirectory, options.shouldEstablishIPhoneLinks)
+	if options.indexPageSize < 0:
+		print("Error: The index page size can't be negative", file=sys.stderr)
+		return errno.EINVAL
 	
-	# Convert to HTML
-	if options.makeHTML:
-		if verbose:
-			print "Converting to HTML:"
-		htmlOutputDirectory = os.path.join(options.outputDirectory, "html")
-		if (os.path.exists(os.path.join(xmlOutputDirectory, "Classes"))):
-			for fileName in os.listdir(os.path.join(xmlOutputDirectory, "Classes")):
-				filePath = os.path.join(xmlOutputDirectory, "Classes", fileName)
-				convertToHTML(filePath, htmlOutputDirectory)
-		if (os.path.exists(os.path.join(xmlOutputDirectory, "Categories"))):
-			for fileName in os.listdir(os.path.join(xmlOutputDirectory, "Categories")):
-				filePath = os.path.join(xmlOutputDirectory, "Categories", fileName)
-				convertToHTML(filePath, htmlOutputDirectory)
-		if (os.path.exists(os.path.join(xmlOutputDirectory, "Protocols"))):
-			for fileName in os.listdir(os.path.join(xmlOutputDirectory, "Protocols")):
-				filePath = os.path.join(xmlOutputDirectory, "Protocols", fileName)
-				convertToHTML(filePath, htmlOutputDirectory)
-		if verbose:
-			print "Converting index.html"
-		convertIndexToHTML(indexPath, htmlOutputDirectory)
-		
-		if verbose:
-			print "Copying CSS stylesheets"
-		# Copy the CSS files over to the new path
-		cssPath = sys.path[0] + '/css'
-		os.system("cp -R \"%s\" \"%s\"" % (cssPath, htmlOutputDirectory))
-			
-	# Set the project name where necessary
-	if verbose:
-		print "Setting project name"
-	insertProjectName(xmlOutputDirectory, options.projectName)
-	if options.makeHTML:
-		insertProjectName(htmlOutputDirectory, options.projectName)
-		
+	if options.compress and not haveBrotli:
+		print("Warning: The brotli module is not installed, so only gzip compressed files will be written", file=sys.stderr)
+	
+	# Load the framework symbol tables
+	try:
+		pipeline = Pipeline(options.makeHTML, options.shouldEstablishIPhoneLinks, options.symbolTables, options.renderer, options.compress, options.cacheDirectory, options.cacheSize, options.jobs, options.verbose, bool(options.profile or options.statsPath), options.indexPageSize)
+	except (IOError, ValueError) as e:
+		print("Error: Could not read symbol table: %s" % (e), file=sys.stderr)
+		return errno.EINVAL
+	
+	if projects:
+		pipeline.buildProjects(projects, options.outputDirectory, options.projectName, options.rebuild)
+		writeReport(options, pipeline.report)
+		return 0
+	elif not options.watch:
+		pipeline.build(options.inputDirectory, options.outputDirectory, options.projectName, options.rebuild)
+		writeReport(options, pipeline.report)
+		return 0
+	
+	try:
+		for objects in pipeline.watch(options.inputDirectory, options.outputDirectory, options.projectName, options.watchInterval, options.rebuild):
+			writeReport(options, pipeline.report)
+	except KeyboardInterrupt:
+		pass
 	return 0
 	
 if __name__ == '__main__':
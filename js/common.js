@@ -0,0 +1,31 @@
+function toggleTOC() {
+	var toc = document.getElementById('tableOfContents');
+	var tocButton = document.getElementById('toc_button');
+	var contents = document.getElementById('contents');
+	if (toc.style.display == 'block') {
+		toc.style.display = 'none';
+		contents.className = '';
+		tocButton.className = '';
+	} else {
+		toc.style.display = 'block';
+		contents.className = 'tableOfContentsOpen';
+		tocButton.className = 'open';
+	}
+}
+
+function toggleTOCItem() {
+	var listItem = event.srcElement;
+	var sublist = listItem.getElementsByTagName('ul')[0];
+	if (sublist.style.display == 'block') {
+		sublist.style.display = 'none';
+		listItem.className = 'expandable';
+	} else {
+		sublist.style.display = 'block';
+		listItem.className = 'expandable expanded';
+	}
+}
+
+function jumpTo() {
+	selectedItem = event.srcElement.options[event.srcElement.selectedIndex].value;
+	window.location = "#" + selectedItem;
+}
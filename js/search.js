@@ -0,0 +1,119 @@
+// The search box on each page looks names up in search/, where the index
+// is split into shards by the first two characters of each name.
+// Shards are loaded the first time a query needs them.
+
+var searchRoot = findSearchRoot();
+var searchShardKeys;
+var searchShards = {};
+var searchQuery = '';
+var maximumSearchResults = 50;
+
+// Pages link to this script relative to the top of the documentation
+function findSearchRoot() {
+	var scripts = document.getElementsByTagName('script');
+	for (var i = 0; i < scripts.length; i++) {
+		var source = scripts[i].getAttribute('src');
+		if (source && source.match(/js\/search\.js$/)) {
+			return source.replace(/js\/search\.js$/, '');
+		}
+	}
+	return '';
+}
+
+function loadSearchFile(fileName) {
+	var script = document.createElement('script');
+	script.type = 'text/javascript';
+	script.src = searchRoot + 'search/' + fileName;
+	document.getElementsByTagName('head')[0].appendChild(script);
+}
+
+function searchShardKey(text) {
+	return text.substr(0, 2).toLowerCase().replace(/[^a-z0-9]/g, '_');
+}
+
+// Called by search/shards.js
+function setSearchShards(keys) {
+	searchShardKeys = keys;
+	search(searchQuery);
+}
+
+// Called by each shard, with its symbols sorted by name
+function addSearchShard(key, symbols) {
+	searchShards[key] = symbols;
+	search(searchQuery);
+}
+
+function search(query) {
+	searchQuery = query.replace(/^\s+|\s+$/g, '');
+	var prefix = searchQuery.toLowerCase();
+	if (!prefix) {
+		showSearchResults([]);
+		return;
+	}
+	if (searchShardKeys === undefined) {
+		searchShardKeys = null;
+		loadSearchFile('shards.js');
+	}
+	if (!searchShardKeys) {
+		return;
+	}
+	
+	// Load every shard whose names could start with the query
+	var key = searchShardKey(prefix);
+	var keys = [];
+	var loading = false;
+	for (var i = 0; i < searchShardKeys.length; i++) {
+		if (searchShardKeys[i].indexOf(key) == 0) {
+			keys.push(searchShardKeys[i]);
+			if (searchShards[searchShardKeys[i]] === undefined) {
+				searchShards[searchShardKeys[i]] = null;
+				loadSearchFile(searchShardKeys[i] + '.js');
+			}
+			loading = loading || !searchShards[searchShardKeys[i]];
+		}
+	}
+	if (loading) {
+		return;
+	}
+	
+	var results = [];
+	for (var i = 0; i < keys.length && results.length < maximumSearchResults; i++) {
+		var symbols = searchShards[keys[i]];
+		for (var j = 0; j < symbols.length && results.length < maximumSearchResults; j++) {
+			if (symbols[j][0].toLowerCase().indexOf(prefix) == 0) {
+				results.push(symbols[j]);
+			}
+		}
+	}
+	showSearchResults(results);
+}
+
+// Each result is [name, kind, page], where page is relative to searchRoot
+function showSearchResults(results) {
+	var list = document.getElementById('searchResults');
+	while (list.firstChild) {
+		list.removeChild(list.firstChild);
+	}
+	for (var i = 0; i < results.length; i++) {
+		var name = results[i][0];
+		if (results[i][1] == 'class-method') {
+			name = '+ ' + name;
+		} else if (results[i][1] == 'instance-method') {
+			name = '- ' + name;
+		}
+		var link = document.createElement('a');
+		link.href = searchRoot + results[i][2];
+		link.appendChild(document.createTextNode(name));
+		
+		// Members also show the object they belong to
+		var listItem = document.createElement('li');
+		listItem.appendChild(link);
+		if (results[i][2].indexOf('#') != -1) {
+			var owner = document.createElement('span');
+			owner.appendChild(document.createTextNode(results[i][2].replace(/^.*\/(.*)\.html#.*$/, '$1')));
+			listItem.appendChild(owner);
+		}
+		list.appendChild(listItem);
+	}
+	list.style.display = results.length ? 'block' : 'none';
+}